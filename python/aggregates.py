@@ -0,0 +1,88 @@
+"""
+Aggregates - Per-ingest rollups for the dashboard endpoints
+Records are reduced once to a small cube (type x ministry x status x location x month)
+and sector/district slices are computed from the cube, not from the records.
+The cube is counted over the store's dictionary-encoded columns in one array pass
+"""
+from collections import Counter
+
+import numpy as np
+
+from record_store import RecordStore
+
+
+class AggregateCube:
+    ROLLUPS = ('type', 'ministry', 'status', 'location', 'month')
+    # Label for records missing a field
+    DEFAULTS = ('unknown', 'Unknown', 'unknown', 'Unknown', 'unknown')
+
+    def __init__(self, records, max_cached_slices=256):
+        """
+        Build the cube
+
+        Args:
+            records: RecordStore (or a list of records, indexed on the fly)
+            max_cached_slices: Bound on memoized sector/district slices
+        """
+        store = records if isinstance(records, RecordStore) else RecordStore(records)
+        columns = [store.column(name) for name in self.ROLLUPS]
+
+        self.cells = Counter()
+        if len(store):
+            # Each distinct row of codes is one cell
+            stacked = np.stack([codes for codes, _ in columns], axis=1)
+            rows, counts = np.unique(stacked, axis=0, return_counts=True)
+            labels = [
+                [default if value is None else value for value in values]
+                for (_, values), default in zip(columns, self.DEFAULTS)
+            ]
+            for row, count in zip(rows.tolist(), counts.tolist()):
+                key = tuple(labels[dim][code] for dim, code in enumerate(row))
+                self.cells[key] += count
+
+        self.max_cached_slices = max_cached_slices
+        self._slices = {}
+        self._slices[(None, None)] = self._compute_slice(None, None)
+
+    def slice(self, sector=None, district=None):
+        """
+        Rollups restricted to a sector and/or district
+
+        Args:
+            sector: Matches a record type or a substring of its ministry (case-insensitive)
+            district: Substring of the record location (case-insensitive)
+
+        Returns:
+            Dict with 'total' and one {value: count} dict per rollup dimension
+        """
+        key = (self._normalize(sector), self._normalize(district))
+        cached = self._slices.get(key)
+        if cached is None:
+            if len(self._slices) >= self.max_cached_slices:
+                self._slices = {(None, None): self._slices[(None, None)]}
+            cached = self._slices[key] = self._compute_slice(*key)
+        return cached
+
+    def _compute_slice(self, sector, district):
+        rollups = {name: Counter() for name in self.ROLLUPS}
+        total = 0
+
+        for (item_type, ministry, status, location, month), count in self.cells.items():
+            if sector and sector != str(item_type).lower() and sector not in str(ministry).lower():
+                continue
+            if district and district not in str(location).lower():
+                continue
+
+            total += count
+            for name, value in zip(self.ROLLUPS, (item_type, ministry, status, location, month)):
+                rollups[name][value] += count
+
+        result = {name: dict(counter) for name, counter in rollups.items()}
+        result['total'] = total
+        return result
+
+    @staticmethod
+    def _normalize(value):
+        """Lowercase filter value; empty and 'all' mean no filter"""
+        value = (value or '').strip().lower()
+        return value if value and value != 'all' else None
@@ -2,118 +2,308 @@
 Flask API Server - Track India
 Real data integration with data.gov.in, NewsAPI, and RAG/Gemini AI
 """
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
 from datetime import datetime
+import itertools
 import threading
+import asyncio
+import time
+import json
 import os
 
 # Import real data modules
 from data_fetcher import fetcher
-from rag.build_vector_db import get_builder
+from rag.build_vector_db import get_builder, open_search_collection
 from rag.query_rag import initialize_rag, get_rag_query
+from rag.admission import ChatOverloaded
+from rag.filters import normalize_filters
+from readiness import readiness
+from leader import LeaderLock
+from snapshots import SnapshotStore, SnapshotFollower
+from rag.vector_index import LocalVectorIndex
 
 app = Flask(__name__)
 CORS(app)
 
-# Global initialization
-_initialized = False
-_init_lock = threading.Lock()
+# Largest accepted /api/chat/batch request
+MAX_BATCH_QUERIES = 50
+# Documents retrieved per batch question are clamped to this range
+MAX_BATCH_TOP_K = 20
+# Search results per page are clamped to this range
+MAX_SEARCH_LIMIT = 100
+
+# "development": this process fetches, embeds and serves everything.
+# "production": one elected worker runs the scheduler and publishes immutable
+# snapshots; every other worker serves the latest snapshot (index memory-mapped).
+SERVING_MODE = os.getenv("TRACK_INDIA_MODE", "development").lower()
+snapshots = SnapshotStore(os.getenv("SNAPSHOT_DIR", "data/snapshots"))
+leader = LeaderLock(os.getenv("LEADER_LOCK_PATH", "data/scheduler.lock"))
+_follower = None
+_follower_collection = None
+# Serializes a follower's first snapshot load with its promotion to leader
+_role_lock = threading.Lock()
+
+# Background warm-up (started once per process)
+_warmup_thread = None
+_warmup_lock = threading.Lock()
 
 def initialize_system():
-    """Initialize data fetcher, vector DB, and RAG system"""
-    global _initialized
+    """Load data, vector DB and RAG system in phases, then start the data fetcher"""
+    if SERVING_MODE == 'production' and not leader.try_acquire():
+        _initialize_follower()
+        return
+    
+    print("\n" + "="*60)
+    print("🚀 INITIALIZING TRACK INDIA SYSTEM")
+    print("="*60)
+    
+    # Step 1: Load stored records (fetches only if nothing is stored yet; embedding waits for step 2)
+    print("\n1️⃣ Loading data...")
+    readiness.start('data_loaded')
+    try:
+        records = fetcher.get_cached_data()
+        readiness.ready('data_loaded')
+    except Exception as e:
+        readiness.fail('data_loaded', e)
+        records = []
+    
+    # Followers can serve the data endpoints before the index is built
+    if SERVING_MODE == 'production' and records:
+        _publish_snapshot(records, fetcher.get_data_version())
+    
+    # Step 2: Build vector database from the already-parsed records
+    print("\n2️⃣ Building vector database...")
+    readiness.start('index_ready')
+    try:
+        builder = get_builder()
+        success = builder.update_incremental(records)
+        
+        if not success:
+            print("   No existing data found, will fetch on first run...")
+        readiness.ready('index_ready')
+    except Exception as e:
+        readiness.fail('index_ready', e)
+        builder = None
+    
+    # Step 3: Initialize RAG system
+    print("\n3️⃣ Initializing RAG query system...")
+    readiness.start('llm_ready')
+    rag = initialize_rag(builder.search_collection) if builder else None
+    if rag:
+        rag.set_data_version(fetcher.get_data_version())
+        readiness.ready('llm_ready')
+    else:
+        readiness.fail('llm_ready', 'RAG system could not be initialized')
+    
+    # Followers serve from the snapshots this process publishes (records only without an index)
+    if SERVING_MODE == 'production':
+        _publish_snapshot(fetcher.get_cached_data(), fetcher.get_data_version())
+        fetcher.publish_hooks.append(_publish_snapshot)
     
-    with _init_lock:
-        if _initialized:
+    # Step 4: Scheduled fetching (may fetch right away if the data is stale)
+    print("\n4️⃣ Starting data fetcher (6-hour schedule)...")
+    try:
+        fetcher.start_scheduler()
+    except Exception as e:
+        print(f"⚠️  Could not start data fetcher: {e}")
+    
+    print("\n" + "="*60)
+    print(f"✅ SYSTEM INITIALIZED ({readiness.snapshot()['status']})")
+    print("="*60 + "\n")
+
+def _is_follower():
+    """Whether this process serves snapshots instead of owning the index"""
+    return SERVING_MODE == 'production' and not leader.is_leader
+
+def _publish_snapshot(records, data_version):
+    """Leader: publish the dataset (and the saved local index, when it is built) as a new snapshot"""
+    try:
+        index_path = get_builder().index.index_path if readiness.is_ready('index_ready') else None
+        snapshots.publish(records, data_version, index_path=index_path)
+    except Exception as e:
+        print(f"⚠️  Could not publish snapshot: {e}")
+
+def _load_snapshot(pointer):
+    """Follower: serve a published snapshot (records in memory, vectors memory-mapped)"""
+    global _follower_collection
+    if leader.is_leader:
+        return
+    fetcher.load_records(snapshots.load_records(pointer['id']))
+    if not readiness.is_ready('data_loaded'):
+        readiness.ready('data_loaded')
+    
+    if os.getenv("VECTOR_BACKEND", "local").lower() == "chroma":
+        # Search-only handle; the builder (manifest, reconcile thread) belongs to the leader
+        collection = open_search_collection()
+    elif pointer.get('has_index'):
+        collection = LocalVectorIndex(snapshots.path(pointer['id'], SnapshotStore.INDEX_FILE))
+    else:
+        # The leader has no index yet; data endpoints work, chat waits for a later snapshot
+        if not readiness.is_ready('index_ready'):
+            readiness.fail('index_ready', 'Leader published a snapshot without a vector index')
+        return
+    
+    _follower_collection = collection
+    if not readiness.is_ready('index_ready'):
+        readiness.ready('index_ready')
+    
+    rag = get_rag_query()
+    if rag:
+        rag.collection = collection
+    else:
+        readiness.start('llm_ready')
+        rag = initialize_rag(collection)
+        if not rag:
+            readiness.fail('llm_ready', 'RAG system could not be initialized')
             return
+    rag.set_data_version(fetcher.data_version)
+    if not readiness.is_ready('llm_ready'):
+        readiness.ready('llm_ready')
+
+def _initialize_follower():
+    """Serve the leader's snapshots; take over the scheduler if the leader goes away"""
+    global _follower
+    print(f"\n👥 Worker {os.getpid()} following published snapshots")
+    fetcher.follower = True
+    readiness.start('data_loaded')
+    readiness.start('index_ready')
+    _follower = SnapshotFollower(snapshots, _load_snapshot, interval_seconds=int(os.getenv("SNAPSHOT_POLL_SECONDS", "15")))
+    
+    # Keep racing for the lock from the start, so a leader that dies before its first publish is replaced
+    leader.start_election(_promote_to_leader, interval_seconds=int(os.getenv("LEADER_RETRY_SECONDS", "30")))
+    
+    # Wait for the leader's first snapshot (or for this worker to become the leader)
+    while True:
+        with _role_lock:
+            if leader.is_leader:
+                return
+            if _follower.check():
+                _follower.start()
+                return
+        time.sleep(2)
+
+def _promote_to_leader():
+    """Follower won the election: own the index, publish snapshots and run the scheduler"""
+    with _role_lock:
+        _follower.stop()
+        fetcher.follower = False
+        
+        # Nothing was published yet when the previous leader died before its first snapshot
+        if not readiness.is_ready('data_loaded'):
+            try:
+                fetcher.get_cached_data()
+                readiness.ready('data_loaded')
+            except Exception as e:
+                readiness.fail('data_loaded', e)
         
         try:
-            print("\n" + "="*60)
-            print("🚀 INITIALIZING TRACK INDIA SYSTEM")
-            print("="*60)
-            
-            # Step 1: Start data fetcher scheduler
-            print("\n1️⃣ Starting data fetcher (6-hour schedule)...")
-            fetcher.start_scheduler()
-            
-            # Step 2: Build vector database
-            print("\n2️⃣ Building vector database...")
             builder = get_builder()
+            builder.update_incremental(fetcher.get_cached_data())
+            if not readiness.is_ready('index_ready'):
+                readiness.ready('index_ready')
             
-            # Try to build from existing data first
-            success = builder.build_from_file('data/fetched_data.json')
-            
-            if not success:
-                print("   No existing data found, will fetch on first run...")
-            
-            # Step 3: Initialize RAG system
-            print("\n3️⃣ Initializing RAG query system...")
-            initialize_rag(builder.collection)
-            
-            print("\n" + "="*60)
-            print("✅ SYSTEM INITIALIZED SUCCESSFULLY")
-            print("="*60 + "\n")
-            
-            _initialized = True
-            
+            rag = get_rag_query()
+            if rag:
+                rag.collection = builder.search_collection
+            else:
+                readiness.start('llm_ready')
+                rag = initialize_rag(builder.search_collection)
+                if rag:
+                    rag.set_data_version(fetcher.get_data_version())
+                    readiness.ready('llm_ready')
+                else:
+                    readiness.fail('llm_ready', 'RAG system could not be initialized')
         except Exception as e:
-            print(f"\n❌ Initialization failed: {e}")
-            print("   App will continue but features may be limited\n")
+            readiness.fail('index_ready', e)
+        
+        _publish_snapshot(fetcher.get_cached_data(), fetcher.get_data_version())
+        fetcher.publish_hooks.append(_publish_snapshot)
+    
+    try:
+        fetcher.start_scheduler()
+    except Exception as e:
+        print(f"⚠️  Could not start data fetcher: {e}")
+
+def start_warmup():
+    """Run initialize_system on a background thread (no-op after the first call)"""
+    global _warmup_thread
+    if _warmup_thread is not None:
+        return
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=initialize_system, name="warmup", daemon=True)
+            _warmup_thread.start()
 
-# Initialize on first request
+# Servers that import the app without running __main__ start warm-up on the first request
 @app.before_request
-def before_first_request():
-    initialize_system()
+def ensure_warmup():
+    start_warmup()
+
+def _not_ready(phase):
+    """503 response while a warm-up phase is still running (None once it is ready)"""
+    if readiness.is_ready(phase):
+        return None
+    response = jsonify({
+        'success': False,
+        'error': 'Service is starting up',
+        'phase': phase,
+        'message': 'The server is still warming up. Please try again in a few moments.'
+    })
+    response.headers['Retry-After'] = '5'
+    return response, 503
 
 # Health check endpoint
 @app.route('/')
 def home():
-    db_status = "connected" if db is not None else "disconnected"
-    collections = list(db.list_collection_names()) if db is not None else []
-    
     return jsonify({
         'status': 'online',
+        'readiness': readiness.snapshot()['status'],
         'service': 'Track India API',
         'version': '2.0',
         'data_source': 'Real API (data.gov.in + NewsAPI)',
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/health')
+def health():
+    """Warm-up phases and their timings"""
+    return jsonify(dict(readiness.snapshot(), timestamp=datetime.now().isoformat()))
+
 # Real data endpoints
 @app.route('/api/updates')
 def get_updates():
     """Get real government updates from fetched data"""
+    not_ready = _not_ready('data_loaded')
+    if not_ready:
+        return not_ready
+    
     try:
         # Get filter parameters
         update_type = request.args.get('type', 'all')
         limit = int(request.args.get('limit', 20))
         
-        # Get cached data from fetcher
-        all_data = fetcher.get_cached_data()
+        # Indexed store built once per fetch
+        store = fetcher.get_store()
         
-        if not all_data:
+        if not len(store):
             return jsonify({
                 'success': False,
                 'error': 'No data available yet',
                 'message': 'Data is being fetched. Please try again in a few moments.'
             }), 503
         
-        # Filter by type if specified
-        if update_type != 'all':
-            filtered_data = [item for item in all_data if item.get('type') == update_type]
-        else:
-            filtered_data = all_data
-        
-        # Limit results
-        limited_data = filtered_data[:limit]
+        # Filter by type if specified (index lookup), then limit results
+        type_filter = update_type if update_type != 'all' else None
+        limited_data = store.filter(limit=limit, type=type_filter)
+        filtered_count = store.count('type', type_filter) if type_filter else len(store)
         
         # Return in expected format
         return jsonify({
             'success': True,
-            'data': limited_data,
-            'total': len(all_data),
-            'filtered': len(filtered_data),
+            'data': [record.to_dict() for record in limited_data],
+            'total': len(store),
+            'filtered': filtered_count,
             'last_updated': datetime.now().isoformat(),
             'next_update_in': '6 hours'
         })
@@ -128,18 +318,22 @@ def get_updates():
 @app.route('/api/updates/<update_id>')
 def get_update_by_id(update_id):
     """Get a specific update by its ID"""
+    not_ready = _not_ready('data_loaded')
+    if not_ready:
+        return not_ready
+    
     try:
-        # Get cached data from fetcher
-        all_data = fetcher.get_cached_data()
+        # Indexed store built once per fetch
+        store = fetcher.get_store()
         
-        if not all_data:
+        if not len(store):
             return jsonify({
                 'success': False,
                 'error': 'No data available'
             }), 503
         
         # Find the specific update
-        update = next((item for item in all_data if item.get('id') == update_id), None)
+        update = store.get(update_id)
         
         if not update:
             return jsonify({
@@ -148,15 +342,12 @@ def get_update_by_id(update_id):
             }), 404
         
         # Get related updates (same type, different ID)
-        related = [
-            item for item in all_data 
-            if item.get('type') == update.get('type') and item.get('id') != update_id
-        ][:5]
+        related = store.related(update, limit=5)
         
         return jsonify({
             'success': True,
-            'data': update,
-            'related': related,
+            'data': update.to_dict(),
+            'related': [record.to_dict() for record in related],
             'timestamp': datetime.now().isoformat()
         })
         
@@ -170,17 +361,20 @@ def get_update_by_id(update_id):
 @app.route('/api/trends')
 def get_trends():
     """Generate trends from real data"""
+    not_ready = _not_ready('data_loaded')
+    if not_ready:
+        return not_ready
+    
     try:
-        data = fetcher.get_cached_data()
+        sector = request.args.get('sector')
+        district = request.args.get('district')
         
-        if not data:
+        if not len(fetcher.get_store()):
             return jsonify({'error': 'No data available'}), 503
         
-        # Count by type
-        types = {}
-        for item in data:
-            item_type = item.get('type', 'unknown')
-            types[item_type] = types.get(item_type, 0) + 1
+        # Precomputed rollups, sliced by sector/district
+        rollups = fetcher.get_aggregates().slice(sector=sector, district=district)
+        types = rollups['type']
         
         # Format for charts
         trend_data = {
@@ -188,7 +382,10 @@ def get_trends():
             'datasets': [{
                 'label': 'Projects by Type',
                 'data': list(types.values())
-            }]
+            }],
+            'timeline': dict(sorted(rollups['month'].items())),
+            'filters': {'sector': sector, 'district': district},
+            'total': rollups['total']
         }
         
         return jsonify(trend_data)
@@ -199,17 +396,19 @@ def get_trends():
 @app.route('/api/drivers')
 def get_drivers():
     """Get key drivers from real data"""
+    not_ready = _not_ready('data_loaded')
+    if not_ready:
+        return not_ready
+    
     try:
-        data = fetcher.get_cached_data()
+        sector = request.args.get('sector')
+        district = request.args.get('district')
         
-        if not data:
+        if not len(fetcher.get_store()):
             return jsonify({'error': 'No data available'}), 503
         
-        # Count by ministry
-        ministries = {}
-        for item in data:
-            ministry = item.get('ministry', 'Unknown')
-            ministries[ministry] = ministries.get(ministry, 0) + 1
+        # Count by ministry (precomputed rollups, sliced by sector/district)
+        ministries = fetcher.get_aggregates().slice(sector=sector, district=district)['ministry']
         
         # Get top 10 ministries
         top_ministries = sorted(
@@ -232,9 +431,33 @@ def get_drivers():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _sse_events(events):
+    """Format (event, payload) tuples as Server-Sent Events"""
+    try:
+        for event, payload in events:
+            yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    except Exception as e:
+        print(f"Error in /api/chat stream: {e}")
+        yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+
+def _overloaded_response(error):
+    """429/503 with Retry-After when the chat queue is saturated"""
+    response = jsonify({
+        'error': 'Chat is busy',
+        'message': str(error),
+        'retry_after': error.retry_after
+    })
+    response.status_code = error.status_code
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
 @app.route('/api/chat', methods=['POST'])
-def chat():
+async def chat():
     """RAG-powered chat endpoint using Gemini AI"""
+    not_ready = _not_ready('llm_ready')
+    if not_ready:
+        return not_ready
+    
     try:
         # Get query from request
         query = request.json.get('query', '')
@@ -242,20 +465,36 @@ def chat():
         if not query:
             return jsonify({'error': 'No query provided'}), 400
         
+        # Optional metadata filters; obvious ones are also extracted from the question
+        try:
+            filters = normalize_filters(request.json.get('filters'))
+        except ValueError as e:
+            return jsonify({'error': 'Invalid filters', 'message': str(e)}), 400
+        auto_filters = bool(request.json.get('auto_filters', True))
+        
         # Get RAG instance
         rag = get_rag_query()
         
-        if not rag:
-            return jsonify({
-                'error': 'RAG system not initialized',
-                'message': 'The AI system is still starting up. Please try again in a moment.'
-            }), 503
-        
-        # Query the RAG system
-        result = rag.query(query, top_k=5, return_sources=True)
+        # Stream Server-Sent Events when asked for, otherwise return one JSON blob
+        wants_stream = request.json.get('stream') or 'text/event-stream' in request.headers.get('Accept', '')
+        if wants_stream:
+            # Pull the first event now so admission failures still become a 429/503
+            events = rag.query_stream(query, top_k=5, filters=filters, auto_filters=auto_filters)
+            first_event = await asyncio.to_thread(next, events)
+            return Response(
+                _sse_events(itertools.chain([first_event], events)),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+        
+        # Query the RAG system (retrieval and Gemini run in threads off the event loop)
+        result = await rag.aquery(query, top_k=5, return_sources=True,
+                                  filters=filters, auto_filters=auto_filters)
         
         return jsonify(result)
         
+    except ChatOverloaded as e:
+        return _overloaded_response(e)
     except Exception as e:
         print(f"Error in /api/chat: {e}")
         return jsonify({
@@ -263,22 +502,96 @@ def chat():
             'message': str(e)
         }), 500
 
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    """Answer a list of questions in one request (results in request order)"""
+    not_ready = _not_ready('llm_ready')
+    if not_ready:
+        return not_ready
+    
+    try:
+        queries = request.json.get('queries', [])
+        
+        if not isinstance(queries, list) or not queries:
+            return jsonify({'error': 'No queries provided'}), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return jsonify({'error': f'At most {MAX_BATCH_QUERIES} queries per batch'}), 400
+        if not all(isinstance(q, str) and q.strip() for q in queries):
+            return jsonify({'error': 'Every query must be a non-empty string'}), 400
+        
+        try:
+            filters = normalize_filters(request.json.get('filters'))
+        except ValueError as e:
+            return jsonify({'error': 'Invalid filters', 'message': str(e)}), 400
+        
+        try:
+            top_k = min(max(int(request.json.get('top_k', 5)), 1), MAX_BATCH_TOP_K)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'top_k must be an integer'}), 400
+        
+        rag = get_rag_query()
+        
+        results = rag.query_batch(
+            queries,
+            top_k=top_k,
+            return_sources=True,
+            filters=filters,
+            max_workers=int(os.getenv('CHAT_BATCH_PARALLELISM', '4'))
+        )
+        
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'results': results
+        })
+        
+    except Exception as e:
+        print(f"Error in /api/chat/batch: {e}")
+        return jsonify({
+            'error': 'Failed to process batch',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/chat/stats')
+def chat_stats():
+    """Response cache hit/miss counters for the chat endpoint"""
+    rag = get_rag_query()
+    
+    if not rag:
+        return jsonify({
+            'success': False,
+            'error': 'RAG system not initialized'
+        }), 503
+    
+    return jsonify({
+        'success': True,
+        'data': rag.cache_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/api/stats')
 def get_stats():
     """Get system statistics for Live Updates page"""
+    not_ready = _not_ready('data_loaded')
+    if not_ready:
+        return not_ready
+    
     try:
-        # Get cached data
-        cached_data = fetcher.get_cached_data()
+        # Precomputed rollups, optionally sliced by sector/district
+        rollups = fetcher.get_aggregates().slice(
+            sector=request.args.get('sector'),
+            district=request.args.get('district')
+        )
         
         # Count by status
-        active_count = sum(1 for item in cached_data if item.get('status') == 'active')
-        completed_count = sum(1 for item in cached_data if item.get('status') == 'completed')
+        active_count = rollups['status'].get('active', 0)
+        completed_count = rollups['status'].get('completed', 0)
         
         # Count by type
-        policies_count = sum(1 for item in cached_data if item.get('type') == 'policy')
+        policies_count = rollups['type'].get('policy', 0)
         
         # Calculate total funding (mock for now)
-        total_funding = f"₹{len(cached_data) * 1000}Cr"
+        total_funding = f"₹{rollups['total'] * 1000}Cr"
         
         stats_data = {
             'active_projects': active_count,
@@ -287,10 +600,14 @@ def get_stats():
             'completed': completed_count
         }
         
-        # Vector DB stats (optional, for debugging)
+        # Vector DB stats (optional, for debugging; skipped until the index has loaded)
         try:
-            builder = get_builder()
-            vector_count = builder.get_stats()
+            if not readiness.is_ready('index_ready'):
+                raise RuntimeError('vector index still loading')
+            if _is_follower():
+                vector_count = _follower_collection.count()
+            else:
+                vector_count = get_builder().get_stats()
             
             print("\n📊 Vector DB Statistics")
             print(f"   Collection: government_data")
@@ -316,25 +633,33 @@ def get_stats():
 @app.route('/api/search')
 def search():
     """Search government data"""
+    not_ready = _not_ready('data_loaded')
+    if not_ready:
+        return not_ready
+    
     try:
         query = request.args.get('q', '')
+        cursor = request.args.get('cursor')
+        
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), MAX_SEARCH_LIMIT)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'limit must be an integer'}), 400
         
         if not query:
             return jsonify({'error': 'No search query provided'}), 400
         
-        data = fetcher.get_cached_data()
-        
-        # Simple text search
-        results = [
-            item for item in data
-            if query.lower() in item.get('title', '').lower()
-            or query.lower() in item.get('description', '').lower()
-        ]
+        # BM25-ranked lookup over the inverted index built at ingest time
+        try:
+            hits, next_cursor, total = fetcher.get_search_index().search(query, limit=limit, cursor=cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         return jsonify({
             'query': query,
-            'count': len(results),
-            'results': results
+            'count': total,
+            'results': [dict(record, score=round(score, 4)) for record, score in hits],
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
@@ -346,4 +671,8 @@ if __name__ == '__main__':
     print("   Data Sources: data.gov.in + NewsAPI")
     print("   AI: Gemini Pro with RAG")
     print("\n")
+    
+    # With the debug reloader, only the serving child process warms up
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warmup()
     app.run(debug=True, port=8010, host='0.0.0.0')
@@ -0,0 +1,167 @@
+"""
+Classifier - Keyword classification of article text into record types and ministries
+Keyword tables are compiled once into hash maps keyed by whole words (and word n-grams
+for phrases), so a text is classified in a single pass over its words and the cost does
+not grow with the number of keywords. Matching is on word boundaries: "port" no longer
+matches "report", nor "act" "impact"
+"""
+import os
+import re
+import json
+from collections import Counter
+
+# Category -> keywords, in priority order (classify() returns the first category that matches).
+# A trailing '*' matches any word starting with the stem ("inaugurat*" -> "inaugurated")
+TYPE_KEYWORDS = {
+    'infrastructure': [
+        'road', 'roads', 'railway', 'railways', 'metro', 'highway', 'highways', 'expressway',
+        'bridge', 'bridges', 'airport', 'airports', 'port', 'ports'
+    ],
+    'funding': [
+        'fund', 'funds', 'funding', 'funded', 'budget', 'budgets', 'allocation', 'allocated',
+        'investment', 'investments', 'crore', 'crores', 'lakh', 'lakhs'
+    ],
+    'policy': [
+        'policy', 'policies', 'bill', 'bills', 'act', 'acts', 'law', 'laws',
+        'regulation*', 'reform', 'reforms'
+    ],
+    'announcement': ['launch*', 'inaugurat*', 'announc*', 'unveil*']
+}
+
+MINISTRY_KEYWORDS = {
+    'Ministry of Railways': ['railways', 'indian railways', 'railway ministry', 'railway minister'],
+    'Ministry of Road Transport and Highways': ['road', 'roads', 'highway', 'highways', 'nhai', 'expressway'],
+    'Ministry of Health and Family Welfare': ['health', 'healthcare', 'hospital', 'hospitals'],
+    'Ministry of Education': ['education', 'school', 'schools', 'university', 'universities'],
+    'Ministry of Finance': ['finance', 'finance ministry', 'finance minister', 'union budget'],
+    'Ministry of Housing and Urban Affairs': ['housing', 'urban affairs', 'smart city', 'smart cities'],
+    'Ministry of Power': ['power', 'electricity', 'power grid'],
+    'Ministry of Commerce and Industry': ['commerce', 'exports', 'imports', 'trade ministry'],
+    'Ministry of Defence': ['defence', 'defense', 'army', 'navy', 'air force'],
+    'Ministry of Home Affairs': ['home ministry', 'home minister', 'home affairs', 'mha']
+}
+
+# Optional JSON file overriding the tables: {"type": {...}, "ministry": {...}}
+CLASSIFIER_KEYWORDS_PATH = os.getenv("CLASSIFIER_KEYWORDS_PATH", "")
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    """Lowercase words of a text"""
+    return _WORD.findall((text or '').lower())
+
+
+class KeywordClassifier:
+    def __init__(self, tables, default=None):
+        """
+        Compile keyword tables
+
+        Args:
+            tables: Dict of category -> list of keywords (words, phrases or 'stem*'), in priority order
+            default: Category returned when nothing matches
+        """
+        self.categories = list(tables)
+        self.default = default
+        self._priority = {category: rank for rank, category in enumerate(self.categories)}
+
+        # Whole words and phrases: tuple of words -> categories
+        self._terms = {}
+        # Prefix stems: stem -> categories (looked up once per distinct stem length)
+        self._stems = {}
+
+        for category, keywords in tables.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if keyword.endswith('*'):
+                    stem = keyword[:-1]
+                    if stem:
+                        self._stems.setdefault(stem, []).append(category)
+                    continue
+                words = tuple(tokenize(keyword))
+                if words:
+                    self._terms.setdefault(words, []).append(category)
+
+        self._max_words = max((len(words) for words in self._terms), default=1)
+        self._stem_lengths = sorted({len(stem) for stem in self._stems})
+
+    def scores(self, text):
+        """
+        All matched categories with their number of keyword hits
+
+        Returns:
+            Dict of category -> score, best first (ties in table priority order)
+        """
+        counts = Counter()
+        tokens = tokenize(text)
+        terms = self._terms
+        stems = self._stems
+
+        for i, token in enumerate(tokens):
+            for n in range(1, self._max_words + 1):
+                if i + n > len(tokens):
+                    break
+                for category in terms.get(tuple(tokens[i:i + n]), ()):
+                    counts[category] += 1
+
+            for length in self._stem_lengths:
+                if length > len(token):
+                    break
+                for category in stems.get(token[:length], ()):
+                    counts[category] += 1
+
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], self._priority[item[0]]))
+        return dict(ranked)
+
+    def classify(self, text):
+        """First matching category in table priority order (default when nothing matches)"""
+        return self._first(self.scores(text))
+
+    def _first(self, scores):
+        return next((category for category in self.categories if category in scores), self.default)
+
+    def scores_batch(self, texts):
+        """scores() for each text"""
+        return [self.scores(text) for text in texts]
+
+    def classify_batch(self, texts):
+        """classify() for each text"""
+        return [self._first(scores) for scores in self.scores_batch(texts)]
+
+
+def _load_tables():
+    """Keyword tables, with CLASSIFIER_KEYWORDS_PATH overrides applied"""
+    tables = {'type': TYPE_KEYWORDS, 'ministry': MINISTRY_KEYWORDS}
+    if not CLASSIFIER_KEYWORDS_PATH:
+        return tables
+    try:
+        with open(CLASSIFIER_KEYWORDS_PATH, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+        for name in tables:
+            if overrides.get(name):
+                tables[name] = overrides[name]
+        print(f"🏷️  Loaded classifier keywords from {CLASSIFIER_KEYWORDS_PATH}")
+    except Exception as e:
+        print(f"⚠️  Could not load classifier keywords {CLASSIFIER_KEYWORDS_PATH}: {e}")
+    return tables
+
+
+# Global instances
+_type_classifier = None
+_ministry_classifier = None
+
+
+def get_type_classifier():
+    """Classifier for record types (default 'announcement')"""
+    global _type_classifier
+    if _type_classifier is None:
+        _type_classifier = KeywordClassifier(_load_tables()['type'], default='announcement')
+    return _type_classifier
+
+
+def get_ministry_classifier():
+    """Classifier for the responsible ministry (default 'Government of India')"""
+    global _ministry_classifier
+    if _ministry_classifier is None:
+        _ministry_classifier = KeywordClassifier(_load_tables()['ministry'], default='Government of India')
+    return _ministry_classifier
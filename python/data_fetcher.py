@@ -4,15 +4,32 @@ Runs every 6 hours and updates the vector database
 """
 import requests
 import json
-import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 import os
 from dotenv import load_dotenv
 
+from record_model import as_dict
+from record_store import RecordStore
+from aggregates import AggregateCube
+from search_index import SearchIndex
+from http_pool import TokenBucket, get_http_pool
+from storage import RecordStorage
+from classifier import get_type_classifier, get_ministry_classifier
+from dedup import NearDuplicateIndex
+
 load_dotenv()
 
+FETCH_STATE_PATH = os.getenv("FETCH_STATE_PATH", "data/fetch_state.json")
+STORAGE_DIR = os.getenv("STORAGE_DIR", "data/store")
+LEGACY_DATA_PATH = 'data/fetched_data.json'
+
+# Recently seen article URLs kept in the cursor (NewsAPI's `from` is inclusive)
+SEEN_URL_LIMIT = 500
+
 class DataFetcher:
     def __init__(self):
         # NewsAPI.org - Free tier (100 requests/day)
@@ -22,11 +39,48 @@ class DataFetcher:
         # API.GovData.in API key (if available)
         self.govdata_api_key = os.getenv("API_KEY", "")
         
+        # Pooled keep-alive sessions, one rate limiter per source
+        self.http = get_http_pool()
+        self.rate_limits = {
+            'newsapi': TokenBucket(float(os.getenv("NEWSAPI_RATE_PER_SEC", "1")), capacity=2),
+            'govdata': TokenBucket(float(os.getenv("GOVDATA_RATE_PER_SEC", "2")), capacity=3)
+        }
+        
+        # Snapshot + append-only log; the legacy JSON file is imported on first load
+        self.storage = RecordStorage(STORAGE_DIR, legacy_path=LEGACY_DATA_PATH)
+        self.export_legacy_json = os.getenv("EXPORT_LEGACY_JSON", "false").lower() == "true"
+        
         self.data_cache = []
+        self.store = RecordStore([])
+        self.aggregates = AggregateCube([])
+        self.search_index = SearchIndex([])
         self.last_fetch_time = None
+        self.data_version = None
+        
+        # Per-source high-water marks; advanced only after a fetch has been saved
+        self.newsapi_max_pages = max(1, int(os.getenv("NEWSAPI_MAX_PAGES", "5")))
+        self.fetch_state = self._load_fetch_state()
+        self._pending_state = {}
+        
+        # Called with (records, data_version) after every completed fetch
+        self.publish_hooks = []
+        
+        # Set in production followers: records only arrive through load_records(), never a fetch
+        self.follower = False
+        
+        # Compiled keyword tables for record type and ministry
+        self.type_classifier = get_type_classifier()
+        self.ministry_classifier = get_ministry_classifier()
+        
+        # Near-duplicate detection for syndicated news (index built on the first fetch)
+        self.dedup_enabled = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+        self.dedup_max_distance = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+        self.dedup_embedding_check = os.getenv("DEDUP_EMBEDDING_CHECK", "true").lower() == "true"
+        self.dedup_cosine_threshold = float(os.getenv("DEDUP_COSINE_THRESHOLD", "0.92"))
+        self._dedup_index = None
         
     def fetch_from_newsapi(self):
-        """Fetch Indian infrastructure/government news from NewsAPI"""
+        """Fetch Indian infrastructure/government news from NewsAPI published since the last fetch"""
         try:
             if not self.news_api_key:
                 print("⚠️  NEWS_API_KEY not found. Using fallback data...")
@@ -34,6 +88,10 @@ class DataFetcher:
             
             url = "https://newsapi.org/v2/everything"
             
+            cursor = self.fetch_state.get('newsapi', {})
+            since = cursor.get('last_published_at')
+            seen_urls = set(cursor.get('seen_urls', []))
+            
             # Fetch news about Indian government, infrastructure, policy
             # Remove domain filter to get more results
             params = {
@@ -43,22 +101,55 @@ class DataFetcher:
                 'sortBy': 'publishedAt',
                 'pageSize': 50,  # Free tier allows up to 100
             }
+            if since:
+                params['from'] = since
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for API errors
-            if data.get('status') != 'ok':
-                print(f"❌ NewsAPI error: {data.get('message', 'Unknown error')}")
+            # Newest first: page until we reach articles we already have
+            articles, caught_up, pages = self._page_newsapi(url, params, since, seen_urls, self.newsapi_max_pages)
+            if articles is None:
                 return self._get_fallback_data()
             
-            articles = data.get('articles', [])
+            # Articles between the cursor and the oldest one fetched were not reached; keep
+            # that window and page it with `to=` on later fetches so nothing is skipped
+            backfill = cursor.get('backfill')
+            if since and not caught_up and articles:
+                oldest = min(article.get('publishedAt') or '' for article in articles)
+                backfill = {'from': backfill['from'] if backfill else since, 'to': oldest}
+            elif backfill and pages < self.newsapi_max_pages:
+                try:
+                    older, done, more_pages = self._page_newsapi(
+                        url, dict(params, **{'from': backfill['from'], 'to': backfill['to']}),
+                        backfill['from'], seen_urls, self.newsapi_max_pages - pages, stop_at_seen=False
+                    )
+                except requests.exceptions.RequestException as e:
+                    print(f"⚠️  NewsAPI backlog fetch failed, retrying next fetch: {e}")
+                    older, done, more_pages = None, False, 0
+                older = older or []
+                articles.extend(older)
+                pages += more_pages
+                if done:
+                    backfill = None
+                elif older:
+                    backfill = {'from': backfill['from'], 'to': min(article.get('publishedAt') or '' for article in older)}
+            
+            print(f"✅ Fetched {len(articles)} new articles from NewsAPI ({pages} page(s))")
+            if backfill:
+                print(f"ℹ️  NewsAPI backlog from {backfill['from']} to {backfill['to']} continues next fetch")
             
-            print(f"✅ Fetched {len(articles)} articles from NewsAPI")
+            if articles or since:
+                recent_urls = [article.get('url') for article in articles if article.get('url')]
+                newest = max((article.get('publishedAt') or '' for article in articles), default='')
+                self._pending_state['newsapi'] = {
+                    'last_published_at': max(newest, since or ''),
+                    'seen_urls': (recent_urls + cursor.get('seen_urls', []))[:SEEN_URL_LIMIT]
+                }
+                if backfill:
+                    self._pending_state['newsapi']['backfill'] = backfill
             
-            if len(articles) == 0:
+            if not articles:
+                if since:
+                    print(f"ℹ️  No articles newer than {since}")
+                    return []
                 print("⚠️  No articles found, using fallback data")
                 return self._get_fallback_data()
             
@@ -71,6 +162,60 @@ class DataFetcher:
             print(f"❌ Error processing NewsAPI data: {e}")
             return self._get_fallback_data()
     
+    def _page_newsapi(self, url, params, since, seen_urls, max_pages, stop_at_seen=True):
+        """
+        Page through NewsAPI results (newest first)
+        
+        Args:
+            since: Oldest publishedAt to keep (None keeps everything)
+            seen_urls: URLs already fetched (skipped)
+            max_pages: Page budget
+            stop_at_seen: Stop at the first page containing an already-fetched article
+        
+        Returns:
+            Tuple of (articles or None if the first page failed, whether the results were
+            exhausted, pages requested)
+        """
+        articles = []
+        caught_up = False
+        page = 0
+        for page in range(1, max_pages + 1):
+            params['page'] = page
+            response = self.http.get(url, params=params, timeout=10, limiter=self.rate_limits['newsapi'])
+            
+            # Later pages may be refused past the plan's result window; keep what we have
+            if page > 1 and response.status_code != 200:
+                print(f"⚠️  NewsAPI stopped paging at page {page} (status {response.status_code})")
+                break
+            response.raise_for_status()
+            
+            data = response.json()
+            
+            # Check for API errors
+            if data.get('status') != 'ok':
+                print(f"❌ NewsAPI error: {data.get('message', 'Unknown error')}")
+                if page == 1:
+                    return None, False, page
+                break
+            
+            batch = data.get('articles', [])
+            fresh = [
+                article for article in batch
+                if article.get('url') not in seen_urls
+                and (not since or (article.get('publishedAt') or '') >= since)
+            ]
+            articles.extend(fresh)
+            
+            caught_up = (
+                (stop_at_seen and len(fresh) < len(batch))
+                or len(batch) < params['pageSize']
+                or page * params['pageSize'] >= data.get('totalResults', 0)
+            )
+            if caught_up:
+                break
+        
+        return articles, caught_up, page
+    
     def fetch_from_govdata_api(self):
         """Fetch data from data.gov.in API"""
         try:
@@ -89,36 +234,10 @@ class DataFetcher:
                 'development projects'
             ]
             
-            for query in search_queries[:1]:  # Only use first query to avoid rate limits
-                try:
-                    # Use the catalog API to search datasets
-                    url = "https://api.data.gov.in/catalog/search"
-                    params = {
-                        'api-key': self.govdata_api_key,
-                        'format': 'json',
-                        'q': query,
-                        'limit': 10
-                    }
-                    
-                    response = requests.get(url, params=params, timeout=15)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        # data.gov.in catalog returns datasets metadata
-                        datasets = data.get('records', [])
-                        
-                        if datasets:
-                            print(f"✅ Found {len(datasets)} datasets from data.gov.in")
-                            # Process catalog results
-                            all_data.extend(datasets[:5])  # Limit to 5 datasets
-                        else:
-                            print(f"⚠️  No datasets found for query: {query}")
-                    else:
-                        print(f"⚠️  Data.gov.in returned status {response.status_code}")
-                        
-                except Exception as e:
-                    print(f"⚠️  Failed to search data.gov.in for '{query}': {e}")
-                    continue
+            # All queries run in parallel; the govdata rate limiter keeps them within quota
+            with ThreadPoolExecutor(max_workers=len(search_queries)) as pool:
+                for datasets in pool.map(self._search_govdata, search_queries):
+                    all_data.extend(datasets)
             
             return self._process_govdata(all_data) if all_data else []
             
@@ -126,22 +245,70 @@ class DataFetcher:
             print(f"⚠️  Data.gov.in API fetch failed: {e}")
             return []
     
+    def _search_govdata(self, query):
+        """Run one data.gov.in catalog search (empty list on failure)"""
+        try:
+            # Use the catalog API to search datasets
+            url = "https://api.data.gov.in/catalog/search"
+            params = {
+                'api-key': self.govdata_api_key,
+                'format': 'json',
+                'q': query,
+                'limit': 10
+            }
+            
+            response = self.http.get(url, params=params, timeout=15, limiter=self.rate_limits['govdata'])
+            
+            if response.status_code == 200:
+                data = response.json()
+                # data.gov.in catalog returns datasets metadata
+                datasets = data.get('records', [])
+                
+                if datasets:
+                    print(f"✅ Found {len(datasets)} datasets from data.gov.in for '{query}'")
+                    return datasets[:5]  # Limit to 5 datasets per query
+                print(f"⚠️  No datasets found for query: {query}")
+            else:
+                print(f"⚠️  Data.gov.in returned status {response.status_code}")
+                
+        except Exception as e:
+            print(f"⚠️  Failed to search data.gov.in for '{query}': {e}")
+        
+        return []
+    
+    def _stable_id(self, prefix, key):
+        """Build a content-derived ID so the same article keeps its ID across fetches"""
+        digest = hashlib.sha1(key.strip().lower().encode('utf-8')).hexdigest()[:16]
+        return f"{prefix}_{digest}"
+    
     def _process_news_data(self, articles):
         """Convert news articles to structured format"""
         processed_data = []
+        seen_ids = set()
+        
+        # Classify the whole batch up front (one pass over each article's words)
+        texts = [f"{article.get('title') or ''} {article.get('description') or ''}" for article in articles]
+        types = self.type_classifier.classify_batch(texts)
+        ministries = self.ministry_classifier.classify_batch(texts)
         
         for idx, article in enumerate(articles):
+            # URL identifies an article; fall back to its title
+            record_id = self._stable_id('news', article.get('url') or article.get('title') or str(idx))
+            if record_id in seen_ids:
+                continue
+            seen_ids.add(record_id)
+            
             # Extract relevant information
             processed = {
-                'id': f"news_{idx}_{int(time.time())}",
-                'type': self._classify_type(article.get('title', '') + article.get('description', '')),
+                'id': record_id,
+                'type': types[idx],
                 'title': article.get('title', 'No title'),
                 'description': article.get('description', '') or article.get('content', ''),
                 'location': 'India',  # Default to India for Indian news
                 'date': article.get('publishedAt', datetime.now().isoformat())[:10],
                 'status': 'active',
                 'priority': 'medium',
-                'ministry': self._extract_ministry(article.get('title', '') + article.get('description', '')),
+                'ministry': ministries[idx],
                 'impact': 75,  # Default impact score
                 'source': article.get('source', {}).get('name', 'Unknown'),
                 'url': article.get('url', ''),
@@ -155,46 +322,17 @@ class DataFetcher:
     
     def _classify_type(self, text):
         """Classify news type based on keywords"""
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['road', 'railway', 'metro', 'highway', 'bridge', 'airport', 'port']):
-            return 'infrastructure'
-        elif any(word in text_lower for word in ['fund', 'budget', 'allocation', 'investment', 'crore', 'lakh']):
-            return 'funding'
-        elif any(word in text_lower for word in ['policy', 'bill', 'act', 'law', 'regulation', 'reform']):
-            return 'policy'
-        elif any(word in text_lower for word in ['launch', 'inaugurat', 'announc', 'unveil']):
-            return 'announcement'
-        else:
-            return 'announcement'
+        return self.type_classifier.classify(text)
     
     def _extract_ministry(self, text):
         """Try to extract ministry name from text"""
-        ministries = {
-            'railways': 'Ministry of Railways',
-            'road': 'Ministry of Road Transport and Highways',
-            'health': 'Ministry of Health and Family Welfare',
-            'education': 'Ministry of Education',
-            'finance': 'Ministry of Finance',
-            'housing': 'Ministry of Housing and Urban Affairs',
-            'power': 'Ministry of Power',
-            'commerce': 'Ministry of Commerce and Industry',
-            'defence': 'Ministry of Defence',
-            'home': 'Ministry of Home Affairs'
-        }
-        
-        text_lower = text.lower()
-        for keyword, ministry in ministries.items():
-            if keyword in text_lower:
-                return ministry
-        
-        return 'Government of India'
+        return self.ministry_classifier.classify(text)
     
     def _get_fallback_data(self):
         """Return minimal fallback data when API is unavailable"""
         return [
             {
-                'id': f'fallback_{int(time.time())}',
+                'id': 'fallback_status',
                 'type': 'infrastructure',
                 'title': 'API Data Fetching Active',
                 'description': 'Real-time government data fetching is configured. Add NEWS_API_KEY to .env to enable live data.',
@@ -210,14 +348,21 @@ class DataFetcher:
     def _process_govdata(self, data):
         """Process data from data.gov.in API"""
         processed_data = []
+        seen_ids = set()
         
         for idx, record in enumerate(data):
             try:
+                title = record.get('title', record.get('scheme_name', record.get('project_name', 'Government Initiative')))
+                record_id = self._stable_id('govdata', record.get('index_name') or record.get('id') or title)
+                if record_id in seen_ids:
+                    continue
+                seen_ids.add(record_id)
+                
                 # Process government data records
                 processed = {
-                    'id': f"govdata_{idx}_{int(time.time())}",
+                    'id': record_id,
                     'type': 'government_data',
-                    'title': record.get('title', record.get('scheme_name', record.get('project_name', 'Government Initiative'))),
+                    'title': title,
                     'description': record.get('description', record.get('details', 'Government data from data.gov.in')),
                     'location': record.get('state', record.get('district', 'India')),
                     'date': record.get('date', record.get('year', datetime.now().strftime('%Y-%m-%d'))),
@@ -237,49 +382,203 @@ class DataFetcher:
         
         return processed_data
     
-    def fetch_all_data(self):
-        """Main function to fetch data from all sources"""
+    def fetch_all_data(self, update_index=True):
+        """
+        Main function to fetch data from all sources
+        
+        Args:
+            update_index: Embed this cycle's records right away. The startup fetch passes False:
+                records are published without loading the embedding model, and the caller
+                indexes the whole dataset afterwards
+        """
+        if self.follower:
+            # Only the elected leader calls upstream APIs and writes storage and the index
+            print("⚠️  Follower worker skipped a data fetch; waiting for the leader's snapshot")
+            return self.data_cache
+        
         print("\n" + "="*60)
         print(f"🔄 Starting data fetch at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*60)
         
-        all_data = []
+        fetched = []
+        started = datetime.now()
+        self._pending_state = {}
+        
+        # Fetch every source concurrently; results are kept in source order
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            news_future = pool.submit(self.fetch_from_newsapi)
+            govdata_future = pool.submit(self.fetch_from_govdata_api)
+            news = news_future.result()
+            govdata = govdata_future.result()
+        
+        print(f"⏱️  Sources fetched in {(datetime.now() - started).total_seconds():.1f}s")
         
-        # Fetch from NewsAPI
-        news_data = self.fetch_from_newsapi()
-        all_data.extend(news_data)
+        # Collapse syndicated copies of the same story before anything is stored or embedded
+        existing = self.data_cache or self._read_saved_records() or []
+        fetched.extend(self._deduplicate(news, existing, embed_check=update_index))
+        fetched.extend(govdata)
         
-        # Fetch from GovData API
-        govdata = self.fetch_from_govdata_api()
-        all_data.extend(govdata)
+        # Merge into what we already have instead of replacing it
+        all_data, removed_ids = self._merge_records(existing, fetched)
+        fetched = [record for record in fetched if record.get('id') not in removed_ids]
         
         # Update cache
-        self.data_cache = all_data
         self.last_fetch_time = datetime.now()
+        self._publish(all_data)
+        all_data = self.data_cache  # Compact records from here on
         
-        # Save to file for persistence
+        # Append this cycle to the record log (only the fetched batch is written)
         try:
-            os.makedirs('data', exist_ok=True)
-            with open('data/fetched_data.json', 'w', encoding='utf-8') as f:
-                json.dump({
-                    'last_updated': self.last_fetch_time.isoformat(),
-                    'count': len(all_data),
-                    'data': all_data
-                }, f, indent=2, ensure_ascii=False)
-            print(f"💾 Saved {len(all_data)} records to data/fetched_data.json")
+            self.storage.append(fetched, removed_ids, total=len(all_data), updated_at=self.last_fetch_time)
+            print(f"💾 Appended {len(fetched)} records to {STORAGE_DIR} ({len(all_data)} stored)")
+            self._commit_fetch_state()
+            
+            if self.storage.should_compact():
+                self.storage.compact(all_data)
+            if self.export_legacy_json:
+                self.storage.export_json(LEGACY_DATA_PATH, all_data)
         except Exception as e:
-            print(f"⚠️  Could not save to file: {e}")
+            print(f"⚠️  Could not save to storage: {e}")
         
-        print(f"✅ Total records fetched: {len(all_data)}")
+        print(f"✅ Records fetched: {len(fetched)} (total stored: {len(all_data)})")
         
-        # Automatically update vector database
-        self._update_vector_db(all_data)
+        if update_index:
+            # Automatically update vector database with this cycle's records only
+            self._update_vector_db(fetched, removed_ids)
+            
+            # Let the RAG system drop answers computed on the previous data
+            self._publish_data_version()
+        
+        for hook in self.publish_hooks:
+            try:
+                hook(all_data, self.data_version)
+            except Exception as e:
+                print(f"⚠️  Publish hook failed: {e}")
         
         print("="*60 + "\n")
         
         return all_data
     
-    def _update_vector_db(self, data):
+    def _deduplicate(self, records, existing, embed_check=True):
+        """
+        Drop articles that near-duplicate one already kept (in this batch or the dataset)
+        
+        The kept (canonical) article lists each dropped copy in `alternate_sources`; a canonical
+        article from the dataset is returned as an updated record so the change is stored
+        
+        Args:
+            embed_check: Confirm borderline pairs with embeddings (False: fingerprints only)
+        
+        Returns:
+            Records to keep, followed by updated canonical records
+        """
+        if not self.dedup_enabled or not records:
+            return records
+        
+        index = self._dedup_index
+        if index is None:
+            index = NearDuplicateIndex(
+                max_distance=self.dedup_max_distance,
+                cosine_threshold=self.dedup_cosine_threshold
+            )
+            for record in existing:
+                if str(record.get('id', '')).startswith('news_'):
+                    index.add(record)
+            self._dedup_index = index
+        index.embed = self._embed_texts if self.dedup_embedding_check and embed_check else None
+        
+        kept = {}
+        updated = {}
+        existing_by_id = {}
+        duplicates = 0
+        
+        def lookup(record_id):
+            if len(self.store):
+                return self.store.get(record_id)
+            if not existing_by_id:
+                existing_by_id.update((item.get('id'), item) for item in existing)
+            return existing_by_id.get(record_id)
+        
+        for record in records:
+            canonical_id, fingerprint = index.find(record)
+            canonical = kept.get(canonical_id) or updated.get(canonical_id)
+            if canonical_id is not None and canonical is None:
+                stored = lookup(canonical_id)
+                if stored is not None:
+                    canonical = dict(as_dict(stored))
+            
+            if canonical is None:
+                # A re-fetched canonical article keeps the sources collected so far
+                previous = lookup(record.get('id'))
+                if previous is not None and previous.get('alternate_sources'):
+                    record['alternate_sources'] = previous.get('alternate_sources')
+                index.add(record, fingerprint)
+                kept[record.get('id')] = record
+                continue
+            
+            duplicates += 1
+            alternates = list(canonical.get('alternate_sources') or [])
+            known_urls = {canonical.get('url')} | {alternate.get('url') for alternate in alternates}
+            if record.get('url') not in known_urls:
+                alternates.append({'id': record.get('id'), 'source': record.get('source'), 'url': record.get('url')})
+                canonical['alternate_sources'] = alternates
+                if canonical_id not in kept:
+                    updated[canonical_id] = canonical
+        
+        if duplicates:
+            print(f"🧬 Skipped {duplicates} near-duplicate articles ({len(updated)} stored articles gained sources)")
+        return list(kept.values()) + list(updated.values())
+    
+    def _embed_texts(self, texts):
+        """Embeddings for the near-duplicate check (shared model, bypassing the embedding cache)"""
+        from rag.embedding_service import get_embedding_service
+        
+        # These texts are never indexed, so caching them would only evict real documents
+        return get_embedding_service().encode(texts)
+    
+    def _merge_records(self, existing, fetched):
+        """
+        Merge freshly fetched records into the existing dataset by ID
+        
+        Returns:
+            Tuple of (merged records with fetched ones first, IDs dropped from the dataset)
+        """
+        fetched_ids = {record.get('id') for record in fetched}
+        merged = list(fetched) + [record for record in existing if record.get('id') not in fetched_ids]
+        
+        # The placeholder record only makes sense while there is no real data
+        removed_ids = []
+        if any(record.get('id') != 'fallback_status' for record in merged):
+            removed_ids = [record.get('id') for record in merged if record.get('id') == 'fallback_status']
+            merged = [record for record in merged if record.get('id') != 'fallback_status']
+        return merged, removed_ids
+    
+    def _load_fetch_state(self):
+        """Per-source cursors from disk (empty if missing or unreadable)"""
+        try:
+            with open(FETCH_STATE_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️  Could not load fetch state: {e}")
+            return {}
+    
+    def _commit_fetch_state(self):
+        """Advance the cursors of this fetch and persist them atomically"""
+        if not self._pending_state:
+            return
+        self.fetch_state.update(self._pending_state)
+        self._pending_state = {}
+        try:
+            tmp_path = FETCH_STATE_PATH + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.fetch_state, f)
+            os.replace(tmp_path, FETCH_STATE_PATH)
+        except Exception as e:
+            print(f"⚠️  Could not save fetch state: {e}")
+    
+    def _update_vector_db(self, data, removed_ids=()):
         """Automatically update vector database with new data"""
         try:
             print("\n🔄 Updating vector database...")
@@ -289,6 +588,9 @@ class DataFetcher:
             
             builder = get_builder()
             
+            if removed_ids:
+                builder.remove_records(removed_ids)
+            
             # Use incremental update to avoid rebuilding entire DB
             success = builder.update_incremental(data)
             
@@ -301,41 +603,110 @@ class DataFetcher:
             print(f"⚠️  Could not update vector database: {e}")
             print("   Vector DB will be updated on next app restart")
     
+    def _publish(self, records):
+        """Build the indexed store, aggregates and search index for a dataset and swap them in"""
+        store = RecordStore(records)
+        aggregates = AggregateCube(store)
+        version = self._compute_data_version(records)
+        search_index = SearchIndex(store.records, version=version)
+        
+        # Readers always see a complete store; each swap is a single assignment
+        self.store = store
+        self.aggregates = aggregates
+        self.search_index = search_index
+        self.data_cache = store.records
+        self.data_version = version
+    
+    def _compute_data_version(self, records):
+        """Fingerprint of the dataset; changes whenever a record is added or edited"""
+        digest = hashlib.sha1()
+        for record in records:
+            digest.update(json.dumps(as_dict(record), sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
+    def _publish_data_version(self):
+        """Push the current data version to the RAG system (invalidates its response cache)"""
+        try:
+            from rag.query_rag import get_rag_query
+            
+            rag = get_rag_query()
+            if rag:
+                rag.set_data_version(self.data_version)
+        except Exception as e:
+            print(f"⚠️  Could not publish data version: {e}")
+    
+    def get_data_version(self):
+        """Version of the currently cached dataset"""
+        if self.data_version is None:
+            self.get_cached_data()
+        return self.data_version
+    
     def get_cached_data(self):
-        """Return cached data or fetch if cache is empty"""
-        if not self.data_cache:
+        """Return cached data or fetch if cache is empty (followers wait for a snapshot instead)"""
+        if not self.data_cache and not self.follower:
             # Try to load from file first
-            try:
-                with open('data/fetched_data.json', 'r', encoding='utf-8') as f:
-                    cached = json.load(f)
-                    self.data_cache = cached.get('data', [])
-                    print(f"📂 Loaded {len(self.data_cache)} records from cache")
-            except FileNotFoundError:
+            records = self._read_saved_records()
+            if records is not None:
+                self._publish(records)
+                print(f"📂 Loaded {len(self.data_cache)} records from cache")
+            else:
+                # Embedding waits for the index phase, so the data endpoints come up first
                 print("📥 No cache found, fetching fresh data...")
-                self.fetch_all_data()
+                self.fetch_all_data(update_index=False)
         
         return self.data_cache
     
+    def _read_saved_records(self):
+        """Records from storage (None if nothing has been saved yet)"""
+        try:
+            return self.storage.load()
+        except Exception as e:
+            print(f"⚠️  Could not load stored records: {e}")
+            return None
+    
+    def load_records(self, records):
+        """Serve an already-published dataset (used by follower workers instead of fetching)"""
+        self._publish(records)
+        self._dedup_index = None
+        
+        # The publishing process owns the cursors and storage; pick up what it wrote
+        self.fetch_state = self._load_fetch_state()
+        self.storage.refresh()
+        print(f"📂 Loaded {len(self.data_cache)} records (version {self.data_version})")
+    
+    def get_store(self):
+        """Return the indexed record store (loading or fetching data if needed)"""
+        if not self.data_cache:
+            self.get_cached_data()
+        return self.store
+    
+    def get_aggregates(self):
+        """Return the dashboard rollups for the current dataset"""
+        self.get_store()
+        return self.aggregates
+    
+    def get_search_index(self):
+        """Return the full-text index for the current dataset"""
+        self.get_store()
+        return self.search_index
+    
     def start_scheduler(self):
         """Start background scheduler to fetch data every 6 hours"""
         scheduler = BackgroundScheduler()
         
         # Check if we have recent data (less than 6 hours old)
+        # Only the small meta file is read here; records are parsed once by get_cached_data
         should_fetch_now = True
-        try:
-            with open('data/fetched_data.json', 'r', encoding='utf-8') as f:
-                cached = json.load(f)
-                last_updated_str = cached.get('last_updated', '')
-                
-                if last_updated_str:
-                    last_updated = datetime.fromisoformat(last_updated_str)
-                    time_since_update = datetime.now() - last_updated
-                    
-                    if time_since_update < timedelta(hours=6):
-                        should_fetch_now = False
-                        print(f"📂 Using cached data from {time_since_update.seconds // 3600}h {(time_since_update.seconds % 3600) // 60}m ago")
-                        print(f"   Next fetch in {6 - (time_since_update.seconds // 3600)}h")
-        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+        last_updated = self.storage.last_updated()
+        if last_updated:
+            time_since_update = datetime.now() - last_updated
+            
+            if time_since_update < timedelta(hours=6):
+                should_fetch_now = False
+                print(f"📂 Using cached data from {time_since_update.seconds // 3600}h {(time_since_update.seconds % 3600) // 60}m ago")
+                print(f"   Next fetch in {6 - (time_since_update.seconds // 3600)}h")
+        
+        if should_fetch_now:
             print("📥 No recent cache found, will fetch immediately...")
         
         # Fetch immediately only if data is old or missing
@@ -356,14 +727,8 @@ class DataFetcher:
         
         # Calculate next fetch time
         if not should_fetch_now:
-            try:
-                with open('data/fetched_data.json', 'r', encoding='utf-8') as f:
-                    cached = json.load(f)
-                    last_updated = datetime.fromisoformat(cached.get('last_updated', ''))
-                    next_fetch = last_updated + timedelta(hours=6)
-                    print(f"   Next fetch at: {next_fetch.strftime('%Y-%m-%d %H:%M:%S')}")
-            except:
-                pass
+            next_fetch = last_updated + timedelta(hours=6)
+            print(f"   Next fetch at: {next_fetch.strftime('%Y-%m-%d %H:%M:%S')}")
         else:
             next_fetch = datetime.now() + timedelta(hours=6)
             print(f"   Next fetch at: {next_fetch.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -381,4 +746,4 @@ if __name__ == "__main__":
     
     if data:
         print("\nSample record:")
-        print(json.dumps(data[0], indent=2))
+        print(json.dumps(as_dict(data[0]), indent=2))
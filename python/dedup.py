@@ -0,0 +1,152 @@
+"""
+Near-Duplicate Detection - Collapse syndicated copies of the same story before embedding
+Each article's title + description is reduced to a 64-bit SimHash of word shingles.
+Banded LSH finds candidates: the 64 bits are split into eleven 5-6 bit bands, so two
+fingerprints within 10 bits always share at least one band. Pairs within 3 bits are
+duplicates; on short texts a single reworded phrase moves the fingerprint by several bits,
+so borderline pairs up to 10 bits are confirmed by embedding cosine similarity
+"""
+import hashlib
+
+import numpy as np
+
+from classifier import tokenize
+
+BITS = 64
+
+
+def record_text(record):
+    """Text compared for near-duplicates"""
+    return f"{record.get('title') or ''} {record.get('description') or ''}"
+
+
+def simhash(text, shingle_size=2):
+    """
+    64-bit SimHash of a text's word shingles
+
+    Args:
+        text: Text to fingerprint
+        shingle_size: Words per shingle (texts shorter than this use single words)
+
+    Returns:
+        Fingerprint as an int (0 for empty text)
+    """
+    tokens = tokenize(text)
+    if len(tokens) >= shingle_size:
+        features = [' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+    else:
+        features = tokens
+    if not features:
+        return 0
+
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little') for feature in features],
+        dtype='<u8'
+    )
+    # Bit matrix (features x 64): each bit votes +1/-1, the sign of the sum is the fingerprint bit
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(features)
+    return int(np.packbits(votes > 0, bitorder='little').view('<u8')[0])
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    def __init__(self, max_distance=3, borderline_distance=10, cosine_threshold=0.92,
+                 embed=None, bands=11, shingle_size=2):
+        """
+        Args:
+            max_distance: Hamming distance up to which fingerprints are duplicates
+            borderline_distance: Pairs up to this distance are checked with embeddings
+            cosine_threshold: Embedding similarity that confirms a borderline pair
+            embed: Callable mapping a list of texts to vectors (None disables the check)
+            bands: LSH bands; every pair within bands - 1 bits shares a band and is a candidate
+                (keep it above borderline_distance)
+            shingle_size: Words per shingle
+        """
+        self.max_distance = max_distance
+        self.borderline_distance = borderline_distance
+        self.cosine_threshold = cosine_threshold
+        self.embed = embed
+        self.bands = bands
+        self.shingle_size = shingle_size
+
+        # (shift, mask) per band; widths differ by at most one bit when bands does not divide 64
+        self._band_slices = []
+        shift = 0
+        for band in range(bands):
+            width = BITS // bands + (1 if band < BITS % bands else 0)
+            self._band_slices.append((shift, (1 << width) - 1))
+            shift += width
+
+        # record ID -> (fingerprint, title, description); strings are shared with the records
+        self._entries = {}
+        self._buckets = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, record_id):
+        return record_id in self._entries
+
+    def _band_keys(self, fingerprint):
+        return [(band, (fingerprint >> shift) & mask) for band, (shift, mask) in enumerate(self._band_slices)]
+
+    def add(self, record, fingerprint=None):
+        """Index a record as a canonical copy"""
+        record_id = record.get('id')
+        if fingerprint is None:
+            fingerprint = simhash(record_text(record), self.shingle_size)
+        self._entries[record_id] = (fingerprint, record.get('title'), record.get('description'))
+        for key in self._band_keys(fingerprint):
+            self._buckets.setdefault(key, []).append(record_id)
+        return fingerprint
+
+    def find(self, record):
+        """
+        Canonical record this one duplicates
+
+        Returns:
+            Tuple of (canonical ID or None, the record's fingerprint)
+        """
+        text = record_text(record)
+        fingerprint = simhash(text, self.shingle_size)
+        if not text.strip():
+            return None, fingerprint
+
+        best, best_distance = None, None
+        borderline = []
+        seen = set()
+        for key in self._band_keys(fingerprint):
+            for candidate_id in self._buckets.get(key, ()):
+                if candidate_id in seen or candidate_id == record.get('id'):
+                    continue
+                seen.add(candidate_id)
+                distance = hamming(fingerprint, self._entries[candidate_id][0])
+                if distance <= self.max_distance:
+                    if best_distance is None or distance < best_distance:
+                        best, best_distance = candidate_id, distance
+                elif distance <= self.borderline_distance:
+                    borderline.append(candidate_id)
+
+        if best is None and borderline and self.embed is not None:
+            best = self._confirm(text, borderline)
+        return best, fingerprint
+
+    def _confirm(self, text, candidate_ids):
+        """Most similar borderline candidate by embedding cosine, if above the threshold"""
+        try:
+            texts = [text] + [f"{title or ''} {description or ''}" for _, title, description in
+                              (self._entries[candidate_id] for candidate_id in candidate_ids)]
+            vectors = np.asarray(self.embed(texts), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️  Embedding check skipped: {e}")
+            return None
+
+        norms = np.linalg.norm(vectors, axis=1)
+        norms[norms == 0] = 1.0
+        similarities = (vectors[1:] @ vectors[0]) / (norms[1:] * norms[0])
+        best = int(np.argmax(similarities))
+        return candidate_ids[best] if similarities[best] >= self.cosine_threshold else None
@@ -0,0 +1,17 @@
+"""
+Gunicorn settings for production serving (loaded automatically from the working directory)
+Threaded workers: a sync worker handles one request at a time, so a few long chat streams
+would block every worker before the chat admission queue could answer 429/503. Each worker
+gets enough threads for all admitted and queued chats plus the data endpoints
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8010")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "gthread"
+threads = int(os.getenv(
+    "GUNICORN_THREADS",
+    str(int(os.getenv("CHAT_MAX_IN_FLIGHT", "4")) + int(os.getenv("CHAT_MAX_QUEUE", "16")) + 8)
+))
+# Chat streams can run longer than gunicorn's 30s default
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
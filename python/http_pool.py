@@ -0,0 +1,147 @@
+"""
+HTTP Pool - Shared keep-alive sessions, per-source rate limits and retries for the fetchers
+One pooled session per host, a token bucket per source, and jittered exponential backoff
+that honors Retry-After on 429/503
+"""
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        """
+        Rate limiter allowing short bursts
+
+        Args:
+            rate: Tokens added per second
+            capacity: Most tokens that can accumulate (burst size)
+        """
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+            time.sleep(wait)
+
+
+class HttpPool:
+    def __init__(self, pool_size=10, max_retries=3, backoff_base=0.5, backoff_cap=30.0):
+        """
+        Args:
+            pool_size: Keep-alive connections kept per host
+            max_retries: Retries after the first attempt for retryable failures
+            backoff_base: First backoff ceiling in seconds (doubles per retry)
+            backoff_cap: Longest single wait in seconds
+        """
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, url):
+        """Pooled session for the URL's host (created on first use)"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def get(self, url, params=None, timeout=10, limiter=None):
+        """
+        GET with rate limiting and retries
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            timeout: Per-attempt timeout in seconds
+            limiter: Optional TokenBucket charged once per attempt
+
+        Returns:
+            The final requests.Response (may still carry a retryable status once retries run out)
+
+        Raises:
+            requests.exceptions.RequestException: If the last attempt failed to connect
+        """
+        session = self.session(url)
+
+        for attempt in range(self.max_retries + 1):
+            if limiter:
+                limiter.acquire()
+            try:
+                response = session.get(url, params=params, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"⚠️  {urlsplit(url).netloc} request failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                return response
+
+            delay = self._retry_after(response)
+            if delay is None:
+                delay = self._backoff(attempt)
+            print(f"⚠️  {urlsplit(url).netloc} returned {response.status_code}, retrying in {delay:.1f}s")
+            response.close()
+            time.sleep(delay)
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response):
+        """Seconds requested by a Retry-After header (None if absent or unparseable)"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return min(self.backoff_cap, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            return min(self.backoff_cap, max(0.0, parsedate_to_datetime(value).timestamp() - time.time()))
+        except (TypeError, ValueError):
+            return None
+
+
+# Global instance
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_http_pool():
+    """Get or create the shared HTTP pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HttpPool()
+    return _pool
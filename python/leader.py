@@ -0,0 +1,77 @@
+"""
+Leader Election - One scheduler owner across all worker processes
+Workers race for an exclusive, non-blocking file lock; the holder runs the data fetcher
+and publishes snapshots. The OS releases the lock when the holder dies, so a follower's
+periodic retry takes over
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LeaderLock:
+    def __init__(self, path="data/scheduler.lock"):
+        """
+        Args:
+            path: Lock file shared by every worker on this host
+        """
+        self.path = path
+        self.is_leader = False
+        self._file = None
+        self._thread = None
+
+    def try_acquire(self):
+        """Take the lock if nobody holds it; returns True if this process is (now) the leader"""
+        if self.is_leader:
+            return True
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        handle = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            handle.close()
+            return False
+
+        # Keep the handle open: closing it would release the lock
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        self._file = handle
+        self.is_leader = True
+        return True
+
+    def start_election(self, on_elected, interval_seconds=30):
+        """
+        Retry the lock in the background until this process wins, then call on_elected()
+
+        Args:
+            on_elected: Callback run once, on the election thread, when leadership is won
+            interval_seconds: Pause between attempts
+        """
+        stop = threading.Event()
+
+        def run():
+            while not stop.is_set():
+                if self.try_acquire():
+                    print(f"👑 Process {os.getpid()} is now the scheduler leader")
+                    on_elected()
+                    return
+                stop.wait(interval_seconds)
+
+        self._thread = threading.Thread(target=run, name="leader-election", daemon=True)
+        self._thread.start()
+        return stop
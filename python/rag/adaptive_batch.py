@@ -0,0 +1,62 @@
+"""
+Adaptive Batch Sizing - Picks ingestion batch sizes from observed upload latency
+Grows batches while uploads are fast, shrinks them when they get slow and backs off
+sharply when the vector store throttles
+"""
+import threading
+
+THROTTLE_MARKERS = ('429', 'too many requests', 'rate limit', 'ratelimit', 'quota', 'throttl')
+
+
+def is_throttled(error):
+    """Whether an upload exception looks like a throttling response"""
+    status = getattr(getattr(error, 'response', None), 'status_code', None) or getattr(error, 'status_code', None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+class AdaptiveBatchSizer:
+    def __init__(self, initial=50, minimum=10, maximum=500, target_seconds=2.0):
+        """
+        Args:
+            initial: Starting batch size
+            minimum: Smallest batch size
+            maximum: Largest batch size
+            target_seconds: Upload latency to aim for per batch
+        """
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.target_seconds = target_seconds
+        self._size = min(self.maximum, max(self.minimum, initial))
+        self._backoff = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        """Batch size to use for the next batch"""
+        return self._size
+
+    @property
+    def backoff_seconds(self):
+        """Pause requested before the next upload (0 unless recently throttled)"""
+        return self._backoff
+
+    def record_success(self, batch_size, seconds):
+        """Adjust after an upload of batch_size records took the given time"""
+        with self._lock:
+            self._backoff = 0.0
+            if seconds < self.target_seconds / 2:
+                # Plenty of headroom: grow by a quarter
+                self._size = min(self.maximum, max(self._size, int(batch_size * 1.25) + 1))
+            elif seconds > self.target_seconds:
+                # Too slow: scale towards the target latency
+                scaled = int(batch_size * self.target_seconds / seconds)
+                self._size = max(self.minimum, min(self._size, scaled))
+
+    def record_throttle(self):
+        """Halve the batch size and double the backoff after a throttling response"""
+        with self._lock:
+            self._size = max(self.minimum, self._size // 2)
+            self._backoff = min(60.0, max(1.0, self._backoff * 2))
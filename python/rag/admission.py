@@ -0,0 +1,104 @@
+"""
+Admission Control - Bound concurrent LLM calls and the queue waiting for them
+Requests beyond the queue bound are rejected immediately instead of tying up workers
+"""
+import math
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+
+
+class ChatOverloaded(Exception):
+    """Raised when a chat request cannot be admitted"""
+
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight=4, max_queue=16, queue_timeout=10.0):
+        """
+        Initialize admission controller
+
+        Args:
+            max_in_flight: Concurrent LLM calls allowed
+            max_queue: Requests allowed to wait for a slot (more are rejected with 429)
+            queue_timeout: Seconds a queued request waits before giving up with 503
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._avg_hold = 3.0  # seconds, exponentially weighted
+
+    def acquire(self):
+        """Take a slot, waiting in the bounded queue if necessary (raises ChatOverloaded)"""
+        with self._cond:
+            if self.in_flight >= self.max_in_flight:
+                if self.waiting >= self.max_queue:
+                    self.rejected += 1
+                    raise ChatOverloaded("Chat queue is full", 429, self._retry_after())
+
+                self.waiting += 1
+                try:
+                    admitted = self._cond.wait_for(lambda: self.in_flight < self.max_in_flight,
+                                                   timeout=self.queue_timeout)
+                finally:
+                    self.waiting -= 1
+
+                if not admitted:
+                    self.timed_out += 1
+                    raise ChatOverloaded("Timed out waiting for a chat slot", 503, self._retry_after())
+
+            self.in_flight += 1
+            self.admitted += 1
+        return time.monotonic()
+
+    def release(self, acquired_at=None):
+        """Return a slot and wake one waiter"""
+        with self._cond:
+            self.in_flight -= 1
+            if acquired_at is not None:
+                held = time.monotonic() - acquired_at
+                self._avg_hold = 0.8 * self._avg_hold + 0.2 * held
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        """Context manager holding one slot"""
+        acquired_at = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(acquired_at)
+
+    async def acquire_async(self):
+        """acquire() without blocking the event loop"""
+        return await asyncio.to_thread(self.acquire)
+
+    def stats(self):
+        """Current load and counters"""
+        with self._cond:
+            return {
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'avg_llm_seconds': round(self._avg_hold, 2)
+            }
+
+    def _retry_after(self):
+        """Seconds until the current queue is likely drained"""
+        return max(1, math.ceil(self._avg_hold * (self.waiting + 1) / self.max_in_flight))
@@ -1,76 +1,188 @@
 """
 Vector Database Builder - Updated to work with API-fetched data
-Builds and updates ChromaDB collection with embeddings from real data
+Builds and updates the local vector index (and optionally a ChromaDB collection)
+with embeddings from real data
 """
 import os
-import json
-import chromadb
-from sentence_transformers import SentenceTransformer
+import re
+import hashlib
 import time
-from datetime import datetime
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from rag.vector_index import LocalVectorIndex
+from rag.manifest import IndexManifest
+from rag.embedding_cache import EmbeddingCache
+from rag.embedding_service import get_embedding_service, EMBEDDING_MODEL_NAME
+from rag.filters import date_to_int
+from rag.record_stream import iter_records
+from rag.adaptive_batch import AdaptiveBatchSizer, is_throttled
+from rag.vector_alias import read_alias
+
 load_dotenv()
 
+# Bump when stored metadata fields change, so existing records are re-upserted
+METADATA_SCHEMA_VERSION = 2
+
+# Time-based IDs used before records got content-derived IDs (news_<idx>_<timestamp>, ...)
+LEGACY_ID_PATTERN = re.compile(r"^(?:(?:news|govdata)_\d+_\d+|fallback_\d+)$")
+
+def connect_chroma(api_key):
+    """ChromaDB Cloud client (falling back to local ChromaDB)"""
+    # Only needed when a Chroma key is configured
+    import chromadb
+    
+    try:
+        client = chromadb.CloudClient(
+            api_key=api_key,
+            tenant="2a5e9e54-7155-4ae8-b0f1-3bde91b5ecf0",
+            database="rag_db"
+        )
+        print("✅ Connected to ChromaDB Cloud")
+    except Exception as e:
+        print(f"⚠️  ChromaDB Cloud connection issue: {e}")
+        print("   Falling back to local ChromaDB...")
+        client = chromadb.Client()
+    return client
+
+def open_search_collection():
+    """
+    Live ChromaDB collection for processes that only search it
+    
+    Unlike get_builder(), no embedding cache, manifest or reconcile thread is set up
+    """
+    api_key = os.getenv("CHROMA_API")
+    if not api_key:
+        raise ValueError("❌ Please set CHROMA_API in .env")
+    collection_name = read_alias().get("collection_name") or "government_data"
+    return connect_chroma(api_key).get_or_create_collection(name=collection_name)
+
 class VectorDBBuilder:
     def __init__(self):
-        # Load Chroma Cloud API key
+        # Search backend used by RAGQuery: "local" (in-process index) or "chroma"
+        self.backend = os.getenv("VECTOR_BACKEND", "local").lower()
+        if self.backend not in ("local", "chroma"):
+            raise ValueError(f"❌ Unknown VECTOR_BACKEND: {self.backend}")
+        
+        # Load Chroma Cloud API key (required only for the chroma backend)
         self.chroma_api_key = os.getenv("CHROMA_API")
-        if not self.chroma_api_key:
+        if self.backend == "chroma" and not self.chroma_api_key:
             raise ValueError("❌ Please set CHROMA_API in .env")
         
-        # Initialize Hugging Face model
-        print("📥 Loading embedding model...")
-        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-        print("✅ Model loaded: all-MiniLM-L6-v2 (384 dimensions)")
+        # Shared embedding model (also used by RAGQuery)
+        self.embedder = get_embedding_service()
         
-        # Chroma Cloud client
-        try:
-            self.client = chromadb.CloudClient(
-                api_key=self.chroma_api_key,
-                tenant="2a5e9e54-7155-4ae8-b0f1-3bde91b5ecf0",
-                database="rag_db"
-            )
-            print("✅ Connected to ChromaDB Cloud")
-        except Exception as e:
-            print(f"⚠️  ChromaDB Cloud connection issue: {e}")
-            print("   Falling back to local ChromaDB...")
-            self.client = chromadb.Client()
+        # Embeddings of already-seen text are reused instead of re-encoded
+        self.embedding_cache = EmbeddingCache(
+            os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite"),
+            model_name=EMBEDDING_MODEL_NAME,
+            max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+        )
+        
+        # A completed rebuild (rag/rebuild.py) points the alias at its generation
+        alias = read_alias()
+        
+        # Local index, persisted next to data/fetched_data.json
+        self.index = LocalVectorIndex(alias.get("index_path") or os.getenv("VECTOR_INDEX_PATH", "data/vector_index.npy"))
+        
+        # Chroma collection is kept in sync whenever a key is configured
+        self.client = None
+        self.collection = None
+        self.collection_name = alias.get("collection_name") or "government_data"
+        if self.chroma_api_key:
+            try:
+                self._connect_chroma()
+            except Exception as e:
+                if self.backend == "chroma":
+                    raise
+                print(f"⚠️  ChromaDB unavailable, using local index only: {e}")
+                self.client = None
+                self.collection = None
+        
+        # Local manifest of stored IDs/hashes answers existence checks and stats
+        self.manifest = IndexManifest(alias.get("manifest_path") or os.getenv("VECTOR_MANIFEST_PATH", "data/vector_manifest.json"))
+        if not self.manifest.legacy_purged:
+            self.purge_legacy_records()
+        
+        # Reconcile against the store searches are served from (both at startup and in the background)
+        if len(self.manifest) != self.search_collection.count():
+            self.manifest.reconcile(self.search_collection)
+        self.manifest.start_background_reconcile(
+            self.search_collection,
+            interval_seconds=int(os.getenv("MANIFEST_RECONCILE_INTERVAL", "3600"))
+        )
+        
+        # Ingestion batch sizing and retry policy
+        self.initial_batch_size = int(os.getenv("INGEST_BATCH_SIZE", "50"))
+        self.max_batch_size = int(os.getenv("INGEST_MAX_BATCH_SIZE", "500"))
+        self.target_upload_seconds = float(os.getenv("INGEST_TARGET_UPLOAD_SECONDS", "2.0"))
+        self.upload_retries = int(os.getenv("INGEST_UPLOAD_RETRIES", "3"))
+        
+        print(f"✅ Vector search backend: {self.backend}")
+    
+    def _connect_chroma(self):
+        """Connect to ChromaDB Cloud (falling back to local ChromaDB)"""
+        self.client = connect_chroma(self.chroma_api_key)
         
         # Get or create collection
-        self.collection_name = "government_data"
         self.collection = self.client.get_or_create_collection(name=self.collection_name)
     
+    @property
+    def search_collection(self):
+        """Collection-like object RAGQuery should search"""
+        if self.backend == "chroma":
+            return self.collection
+        return self.index
+    
     def flatten_record(self, record):
         """Convert record dict to searchable text"""
         parts = []
         
         # Add all fields in a structured way
         for key, value in record.items():
-            if key not in ['id', 'image', 'url']:  # Skip non-text fields
+            if key not in ['id', 'image', 'url', 'alternate_sources']:  # Skip non-text fields
                 parts.append(f"{key}: {value}")
         
         return " | ".join(parts)
     
+    def encode(self, texts):
+        """Embed texts, consulting the persistent embedding cache first"""
+        vectors = self.embedding_cache.get_many(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        
+        if missing:
+            encoded = self.embedder.encode([texts[i] for i in missing])
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+            self.embedding_cache.put_many([texts[i] for i in missing], encoded)
+        
+        return [vector.tolist() for vector in vectors], len(missing)
+    
+    def content_hash(self, text):
+        """Hash of the flattened record text, used to detect edited records"""
+        return hashlib.sha1(f"v{METADATA_SCHEMA_VERSION}|{text}".encode("utf-8")).hexdigest()
+
     def build_from_file(self, file_path="data/fetched_data.json"):
-        """Build vector DB from saved data file"""
+        """Build vector DB from saved data file (JSON or JSONL), streamed record by record"""
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data_container = json.load(f)
+            header = {}
+            records = iter_records(file_path, header=header)
             
-            # Extract data array
-            if isinstance(data_container, dict):
-                data = data_container.get('data', [])
-                last_updated = data_container.get('last_updated', 'Unknown')
-            else:
-                data = data_container
-                last_updated = datetime.now().isoformat()
+            # Pull the first record so the header fields before 'data' are known
+            first = next(records, None)
             
             print(f"\n📂 Loading data from {file_path}")
-            print(f"   Last updated: {last_updated}")
-            print(f"   Records found: {len(data)}")
+            print(f"   Last updated: {header.get('last_updated', 'Unknown')}")
+            if 'count' in header:
+                print(f"   Records found: {header['count']}")
+            
+            if first is None:
+                print("⚠️  No data to add to vector DB")
+                return False
             
-            return self._add_to_vector_db(data)
+            # Unchanged records are skipped, the rest go through the embedding cache
+            return self.update_incremental(itertools.chain([first], records))
             
         except FileNotFoundError:
             print(f"❌ File not found: {file_path}")
@@ -81,111 +193,276 @@ class VectorDBBuilder:
             return False
     
     def build_from_data(self, data):
-        """Build vector DB directly from data array"""
-        print(f"\n📥 Building vector DB from {len(data)} records")
+        """Build vector DB directly from data array (or any iterable of records)"""
+        if hasattr(data, '__len__'):
+            print(f"\n📥 Building vector DB from {len(data)} records")
         return self._add_to_vector_db(data)
     
-    def _add_to_vector_db(self, data):
-        """Internal method to add data to vector DB"""
-        if not data:
-            print("⚠️  No data to add to vector DB")
-            return False
-        
-        print("\n" + "="*60)
-        print("🔨 Building Vector Database")
-        print("="*60)
-        
-        texts = []
-        ids = []
-        metadatas = []
+    def _prepare(self, record, idx):
+        """Flattened text, ID and metadata for one record"""
+        text = self.flatten_record(record)
+        metadata = {
+            'type': record.get('type', 'unknown'),
+            'title': record.get('title', 'No title')[:200],  # Limit length
+            'date': record.get('date', ''),
+            'ministry': record.get('ministry', 'Unknown'),
+            'source': record.get('source', 'Unknown'),
+            'location': record.get('location', 'Unknown'),
+            'date_int': date_to_int(record.get('date', '')),  # Numeric for range filters
+            'content_hash': self.content_hash(text)
+        }
+        return text, record.get('id', f'doc_{idx}'), metadata
+    
+    def _batches(self, records, batch_size):
+        """
+        Group an iterable of records into prepared (texts, ids, metadatas) batches
         
-        # Prepare data
-        for idx, record in enumerate(data):
-            text = self.flatten_record(record)
+        Args:
+            records: Iterable of record dicts
+            batch_size: Callable returning the size for the batch being filled
+        """
+        texts, ids, metadatas = [], [], []
+        for idx, record in enumerate(records):
+            text, doc_id, metadata = self._prepare(record, idx)
             texts.append(text)
-            ids.append(record.get('id', f'doc_{idx}'))
-            
-            # Store metadata
-            metadata = {
-                'type': record.get('type', 'unknown'),
-                'title': record.get('title', 'No title')[:200],  # Limit length
-                'date': record.get('date', ''),
-                'ministry': record.get('ministry', 'Unknown'),
-                'source': record.get('source', 'Unknown')
-            }
+            ids.append(doc_id)
             metadatas.append(metadata)
+            if len(texts) >= batch_size():
+                yield texts, ids, metadatas
+                texts, ids, metadatas = [], [], []
+        if texts:
+            yield texts, ids, metadatas
+    
+    def _add_to_vector_db(self, data, empty_ok=False):
+        """
+        Internal method to add data to vector DB
         
-        # Generate embeddings and add to ChromaDB in batches
-        batch_size = 50
+        Records are consumed lazily, so only one batch is held in memory at a time.
+        With empty_ok, an empty input is a successful no-op instead of an error.
+        """
+        # Encode batch N+1 while batch N uploads; batch size follows upload latency
+        sizer = AdaptiveBatchSizer(
+            initial=self.initial_batch_size,
+            maximum=self.max_batch_size,
+            target_seconds=self.target_upload_seconds
+        )
         total_added = 0
+        failed = 0
+        batch_number = 0
+        started = time.time()
+        pending = None
         
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i+batch_size]
-            batch_ids = ids[i:i+batch_size]
-            batch_metadatas = metadatas[i:i+batch_size]
-            
-            # Generate embeddings for batch
-            print(f"   Processing batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}...")
-            embeddings = self.model.encode(batch_texts).tolist()
-            
-            try:
-                # Add to ChromaDB
-                self.collection.add(
-                    documents=batch_texts,
-                    metadatas=batch_metadatas,
-                    ids=batch_ids,
-                    embeddings=embeddings
-                )
-                total_added += len(batch_texts)
-                print(f"   ✅ Added {len(batch_texts)} records (Total: {total_added})")
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-upload") as uploader:
+            for batch_texts, batch_ids, batch_metadatas in self._batches(data, lambda: sizer.size):
+                if batch_number == 0:
+                    print("\n" + "="*60)
+                    print("🔨 Building Vector Database")
+                    print("="*60)
+                batch_number += 1
                 
-                # Pause to avoid overwhelming the API
-                if i + batch_size < len(texts):
-                    time.sleep(0.5)
-                    
-            except Exception as e:
-                print(f"   ⚠️  Error adding batch: {e}")
-                continue
+                # Generate embeddings for batch
+                print(f"   Processing batch {batch_number} ({len(batch_texts)} records)...")
+                embeddings, encoded_count = self.encode(batch_texts)
+                if encoded_count < len(batch_texts):
+                    print(f"   ♻️  Reused {len(batch_texts) - encoded_count} cached embeddings")
+                
+                # At most one upload in flight keeps memory at two batches
+                if pending is not None:
+                    future, pending_size = pending
+                    added = future.result()
+                    total_added += added
+                    failed += pending_size - added
+                    self._report_progress(total_added, started)
+                
+                pending = (
+                    uploader.submit(self._upload_batch, batch_ids, embeddings, batch_texts, batch_metadatas, sizer),
+                    len(batch_ids)
+                )
+            
+            if pending is not None:
+                future, pending_size = pending
+                added = future.result()
+                total_added += added
+                failed += pending_size - added
+                self._report_progress(total_added, started)
+        
+        if batch_number == 0:
+            if not empty_ok:
+                print("⚠️  No data to add to vector DB")
+            return empty_ok
+        
+        try:
+            self.index.save()
+            self.manifest.mark_ingest()
+            self.manifest.save()
+        except Exception as e:
+            print(f"   ⚠️  Could not persist local vector index: {e}")
         
         print("="*60)
         print(f"✅ Vector DB built successfully!")
         print(f"   Collection: {self.collection_name}")
         print(f"   Total records: {total_added}")
+        if failed:
+            print(f"   ⚠️  Failed records: {failed}")
+        print(f"   Throughput: {total_added / max(time.time() - started, 1e-6):.1f} records/s")
         print(f"   Embedding model: all-MiniLM-L6-v2")
         print(f"   Dimensions: 384")
         print("="*60 + "\n")
         
         return True
     
+    def _upload_batch(self, ids, embeddings, documents, metadatas, sizer, targets=None):
+        """
+        Upsert one batch into the local index and ChromaDB, retrying on failure
+        
+        Upserts are idempotent, so a retried batch never duplicates records.
+        
+        Args:
+            targets: Optional (index, collection, manifest) to write instead of the live ones
+        
+        Returns:
+            Number of records stored (0 if every attempt failed)
+        """
+        index, collection, manifest = targets or (self.index, self.collection, self.manifest)
+        for attempt in range(self.upload_retries + 1):
+            if sizer.backoff_seconds:
+                time.sleep(sizer.backoff_seconds)
+            
+            upload_started = time.time()
+            try:
+                # Add to local index, then keep ChromaDB in sync
+                index.upsert(
+                    ids=ids,
+                    embeddings=embeddings,
+                    documents=documents,
+                    metadatas=metadatas
+                )
+                if collection is not None:
+                    collection.upsert(
+                        documents=documents,
+                        metadatas=metadatas,
+                        ids=ids,
+                        embeddings=embeddings
+                    )
+                manifest.record(ids, metadatas)
+                sizer.record_success(len(ids), time.time() - upload_started)
+                return len(ids)
+            
+            except Exception as e:
+                if is_throttled(e):
+                    sizer.record_throttle()
+                    print(f"   ⏳ Upload throttled, next batch size {sizer.size}: {e}")
+                else:
+                    print(f"   ⚠️  Error adding batch (attempt {attempt + 1}/{self.upload_retries + 1}): {e}")
+                    if attempt < self.upload_retries:
+                        time.sleep(min(30, 2 ** attempt))
+        
+        print(f"   ❌ Dropped batch of {len(ids)} records after {self.upload_retries + 1} attempts")
+        return 0
+    
+    def _report_progress(self, total_added, started):
+        """Print the running total and ingestion rate"""
+        elapsed = max(time.time() - started, 1e-6)
+        print(f"   ✅ Upserted {total_added} records ({total_added / elapsed:.1f} records/s)")
+    
     def update_incremental(self, new_data):
-        """Update vector DB with new data (incremental updates)"""
-        print(f"\n🔄 Incremental update with {len(new_data)} new records")
+        """Update vector DB with new data, embedding only new or edited records"""
+        if hasattr(new_data, '__len__'):
+            print(f"\n🔄 Incremental update with {len(new_data)} records")
+        else:
+            print("\n🔄 Incremental update (streaming)")
         
-        # Check which IDs already exist
-        existing_ids = set()
-        try:
-            # Get all existing IDs
-            result = self.collection.get()
-            existing_ids = set(result.get('ids', []))
-            print(f"   Found {len(existing_ids)} existing records")
-        except Exception as e:
-            print(f"   Could not fetch existing IDs: {e}")
+        counts = {'new': 0, 'changed': 0, 'unchanged': 0}
         
-        # Filter out existing records
-        new_records = [r for r in new_data if r.get('id') not in existing_ids]
+        def pending():
+            # Keep new records and records whose text changed since they were embedded
+            for record in new_data:
+                stored_hash = self.manifest.get_hash(record.get('id'))
+                if stored_hash is None:
+                    counts['new'] += 1
+                elif stored_hash != self.content_hash(self.flatten_record(record)):
+                    counts['changed'] += 1
+                else:
+                    counts['unchanged'] += 1
+                    continue
+                yield record
         
-        if not new_records:
-            print("   ℹ️  No new records to add")
+        success = self._add_to_vector_db(pending(), empty_ok=True)
+        print(f"   New: {counts['new']} | Changed: {counts['changed']} | Unchanged: {counts['unchanged']}")
+        
+        if not counts['new'] and not counts['changed']:
+            print("   ℹ️  No new or changed records to embed")
+            return True
+        
+        return success
+    
+    def remove_records(self, ids):
+        """Drop records from the index, ChromaDB and the manifest"""
+        ids = [doc_id for doc_id in ids if doc_id in self.manifest]
+        if not ids:
+            return True
+        try:
+            self.index.delete(ids)
+            self.index.save()
+            if self.collection is not None:
+                self.collection.delete(ids=ids)
+            self.manifest.remove(ids)
+            self.manifest.save()
+            print(f"🗑️  Removed {len(ids)} records from vector DB")
             return True
+        except Exception as e:
+            print(f"⚠️  Could not remove records from vector DB: {e}")
+            return False
+    
+    def purge_legacy_records(self, page_size=500):
+        """
+        Delete vectors stored under legacy time-based IDs from the index and ChromaDB
         
-        print(f"   Adding {len(new_records)} new records...")
-        return self._add_to_vector_db(new_records)
+        Every fetch used to store the same articles under new IDs; the current records
+        are stored under content-derived IDs, so these copies are duplicates
+        
+        Returns:
+            Number of legacy IDs deleted
+        """
+        stores = [store for store in (self.index, self.collection) if store is not None]
+        try:
+            legacy = set()
+            for store in stores:
+                offset = 0
+                while True:
+                    page = store.get(include=[], limit=page_size, offset=offset).get('ids', [])
+                    legacy.update(doc_id for doc_id in page if LEGACY_ID_PATTERN.match(doc_id))
+                    if len(page) < page_size:
+                        break
+                    offset += page_size
+            
+            legacy = list(legacy)
+            for i in range(0, len(legacy), page_size):
+                chunk = legacy[i:i + page_size]
+                for store in stores:
+                    store.delete(ids=chunk)
+            if legacy:
+                self.index.save()
+                self.manifest.remove(legacy)
+                print(f"🗑️  Removed {len(legacy)} records stored under legacy IDs")
+            
+            self.manifest.legacy_purged = True
+            self.manifest.save()
+            return len(legacy)
+        except Exception as e:
+            print(f"⚠️  Could not remove legacy records (retrying next start): {e}")
+            return 0
     
     def clear_collection(self):
         """Clear all data from the collection"""
         try:
-            self.client.delete_collection(name=self.collection_name)
-            self.collection = self.client.get_or_create_collection(name=self.collection_name)
+            self.index.delete(list(self.index.get(include=[])['ids']))
+            self.index.save()
+            self.manifest.clear()
+            self.manifest.save()
+            if self.client is not None:
+                self.client.delete_collection(name=self.collection_name)
+                self.collection = self.client.get_or_create_collection(name=self.collection_name)
             print(f"✅ Cleared collection: {self.collection_name}")
             return True
         except Exception as e:
@@ -193,14 +470,15 @@ class VectorDBBuilder:
             return False
     
     def get_stats(self):
-        """Get collection statistics"""
+        """Get collection statistics (from the local manifest, no store round trip)"""
         try:
-            result = self.collection.get()
-            count = len(result.get('ids', []))
+            stats = self.manifest.stats()
+            count = stats['total']
             
             print(f"\n📊 Vector DB Statistics")
-            print(f"   Collection: {self.collection_name}")
+            print(f"   Collection: {self.collection_name} ({self.backend})")
             print(f"   Total records: {count}")
+            print(f"   Last ingest: {stats['last_ingest']}")
             print(f"   Embedding dimensions: 384")
             print(f"   Model: all-MiniLM-L6-v2")
             
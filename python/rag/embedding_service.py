@@ -0,0 +1,105 @@
+"""
+Embedding Service - One shared SentenceTransformer for the whole process
+Concurrent single-text requests are collected into micro-batches before encoding
+"""
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_DIMENSIONS = 384
+
+
+class EmbeddingService:
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, max_batch_size=32, max_wait_ms=5):
+        """
+        Initialize embedding service
+
+        Args:
+            model_name: SentenceTransformer model to load
+            max_batch_size: Most queued texts encoded together
+            max_wait_ms: How long the first queued text waits for others to join its batch
+        """
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        # Imported here so importing this module (and the API) stays cheap
+        from sentence_transformers import SentenceTransformer
+
+        print("📥 Loading embedding model...")
+        self.model = SentenceTransformer(model_name)
+        print(f"✅ Model loaded: {model_name.split('/')[-1]} ({EMBEDDING_DIMENSIONS} dimensions)")
+
+        self._model_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self.batches = 0
+        self.batched_items = 0
+
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def encode(self, texts):
+        """Encode a list of texts in one call (used for ingestion batches)"""
+        with self._model_lock:
+            return self.model.encode(texts)
+
+    def submit(self, text):
+        """Queue a single text for the next micro-batch; returns a Future of its vector"""
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode_query(self, text, timeout=None):
+        """Encode one query through the micro-batcher"""
+        return self.submit(text).result(timeout=timeout)
+
+    def stats(self):
+        """Micro-batching counters"""
+        return {
+            'batches': self.batches,
+            'items': self.batched_items,
+            'avg_batch_size': round(self.batched_items / self.batches, 2) if self.batches else 0
+        }
+
+    def _run(self):
+        """Worker loop: wait for one request, gather more until the window closes, encode"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = self.encode(texts)
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+            self.batches += 1
+            self.batched_items += len(batch)
+
+
+# Process-wide instance shared by VectorDBBuilder and RAGQuery
+_service = None
+_service_lock = threading.Lock()
+
+def get_embedding_service():
+    """Get or create the shared EmbeddingService"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = EmbeddingService()
+    return _service
@@ -0,0 +1,126 @@
+"""
+Retrieval Filters - Structured metadata filters for RAG retrieval
+Normalizes user filters, extracts obvious ones from the question text and translates
+them into a Chroma-style `where` clause understood by both vector backends
+"""
+import re
+from datetime import date, datetime, timedelta
+
+from classifier import get_type_classifier, get_ministry_classifier
+
+FILTER_FIELDS = ('type', 'ministry', 'location', 'date_from', 'date_to')
+
+RELATIVE_DAYS = {
+    'today': 0,
+    'yesterday': 1,
+    'this week': 7,
+    'last week': 7,
+    'past week': 7,
+    'this month': 30,
+    'last month': 30,
+    'past month': 30,
+}
+
+
+def date_to_int(value):
+    """'2025-10-24' (or a longer ISO timestamp) -> 20251024; 0 if unparseable"""
+    try:
+        return int(str(value)[:10].replace('-', ''))
+    except (TypeError, ValueError):
+        return 0
+
+
+def normalize_filters(filters):
+    """
+    Validate a filter dict
+
+    Returns:
+        Dict with only known, non-empty fields (dates as YYYY-MM-DD strings)
+
+    Raises:
+        ValueError: On unknown fields, non-string values or malformed dates
+    """
+    if not filters:
+        return {}
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object")
+
+    unknown = set(filters) - set(FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown filter fields: {', '.join(sorted(unknown))}")
+
+    normalized = {}
+    for field in FILTER_FIELDS:
+        value = filters.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be a string")
+        if value in ('', 'all'):
+            continue
+        if field in ('date_from', 'date_to'):
+            try:
+                value = datetime.fromisoformat(str(value)[:10]).date().isoformat()
+            except ValueError:
+                raise ValueError(f"{field} must be a YYYY-MM-DD date")
+        normalized[field] = value
+    return normalized
+
+
+def extract_filters(query, today=None):
+    """
+    Pull obvious filters out of a question ("railway projects last week")
+
+    Args:
+        query: User question
+        today: Reference date (defaults to today)
+
+    Returns:
+        Filter dict (possibly empty)
+    """
+    today = today or date.today()
+    text = query.lower()
+    filters = {}
+
+    # The ingest classifier's own tables, so a question maps to the values records were given
+    for field, classifier in (('type', get_type_classifier()), ('ministry', get_ministry_classifier())):
+        scores = classifier.scores(text)
+        value = next((category for category in classifier.categories if category in scores), None)
+        if value is not None:
+            filters[field] = value
+
+    match = re.search(r"\b(?:last|past)\s+(\d{1,3})\s+days?\b", text)
+    if match:
+        filters['date_from'] = (today - timedelta(days=int(match.group(1)))).isoformat()
+    elif re.search(r"\bthis year\b", text):
+        filters['date_from'] = date(today.year, 1, 1).isoformat()
+    else:
+        for phrase, days in RELATIVE_DAYS.items():
+            if re.search(rf"\b{phrase}\b", text):
+                filters['date_from'] = (today - timedelta(days=days)).isoformat()
+                break
+
+    return filters
+
+
+def to_where(filters):
+    """Translate normalized filters into a Chroma-style where clause (None if empty)"""
+    conditions = []
+    for field in ('type', 'ministry', 'location'):
+        if field in filters:
+            conditions.append({field: {'$eq': filters[field]}})
+    if 'date_from' in filters:
+        conditions.append({'date_int': {'$gte': date_to_int(filters['date_from'])}})
+    if 'date_to' in filters:
+        conditions.append({'date_int': {'$lte': date_to_int(filters['date_to'])}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {'$and': conditions}
+
+
+def filters_key(filters):
+    """Hashable form of a filter dict (for cache and coalescing keys)"""
+    return tuple(sorted((filters or {}).items()))
@@ -0,0 +1,200 @@
+"""
+Index Manifest - Local record of what has been written to the vector store
+Answers existence checks, content-hash lookups and stats without fetching the collection
+"""
+import os
+import json
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+
+
+class IndexManifest:
+    def __init__(self, path="data/vector_manifest.json"):
+        """
+        Initialize manifest
+
+        Args:
+            path: JSON file the manifest is persisted to
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._entries = {}  # id -> {'hash', 'type', 'ministry'}
+        self._type_counts = Counter()
+        self._ministry_counts = Counter()
+        self.last_ingest = None
+        self.last_reconcile = None
+        # Set once records stored under pre-content-hash IDs have been deleted
+        self.legacy_purged = False
+        self._reconcile_thread = None
+
+        self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._entries
+
+    def get_hash(self, doc_id):
+        """Content hash recorded for an ID (None if unknown)"""
+        entry = self._entries.get(doc_id)
+        return entry['hash'] if entry else None
+
+    def record(self, ids, metadatas):
+        """Register IDs that were written to the store"""
+        with self._lock:
+            for doc_id, metadata in zip(ids, metadatas):
+                metadata = metadata or {}
+                self._forget(doc_id)
+                entry = {
+                    'hash': metadata.get('content_hash'),
+                    'type': metadata.get('type', 'unknown'),
+                    'ministry': metadata.get('ministry', 'Unknown')
+                }
+                self._entries[doc_id] = entry
+                self._type_counts[entry['type']] += 1
+                self._ministry_counts[entry['ministry']] += 1
+
+    def remove(self, ids):
+        """Forget IDs that are no longer in the store"""
+        with self._lock:
+            for doc_id in ids:
+                self._forget(doc_id)
+
+    def clear(self):
+        """Forget everything"""
+        with self._lock:
+            self._entries = {}
+            self._type_counts = Counter()
+            self._ministry_counts = Counter()
+
+    def mark_ingest(self):
+        """Record the time of the latest successful ingest"""
+        self.last_ingest = datetime.now().isoformat()
+
+    def stats(self):
+        """Counts by type/ministry and ingest times"""
+        with self._lock:
+            return {
+                'total': len(self._entries),
+                'by_type': dict(self._type_counts),
+                'by_ministry': dict(self._ministry_counts),
+                'last_ingest': self.last_ingest,
+                'last_reconcile': self.last_reconcile
+            }
+
+    def _forget(self, doc_id):
+        entry = self._entries.pop(doc_id, None)
+        if entry is None:
+            return
+        for counts, key in ((self._type_counts, entry['type']), (self._ministry_counts, entry['ministry'])):
+            counts[key] -= 1
+            if counts[key] <= 0:
+                del counts[key]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Load manifest from disk if present"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"⚠️  Could not load index manifest: {e}")
+            return False
+
+        with self._lock:
+            self.clear()
+            for doc_id, entry in data.get('entries', {}).items():
+                self.record([doc_id], [{
+                    'content_hash': entry.get('hash'),
+                    'type': entry.get('type', 'unknown'),
+                    'ministry': entry.get('ministry', 'Unknown')
+                }])
+            self.last_ingest = data.get('last_ingest')
+            self.last_reconcile = data.get('last_reconcile')
+            self.legacy_purged = data.get('legacy_purged', False)
+        return True
+
+    def save(self):
+        """Persist manifest atomically"""
+        with self._lock:
+            data = {
+                'entries': dict(self._entries),
+                'last_ingest': self.last_ingest,
+                'last_reconcile': self.last_reconcile,
+                'legacy_purged': self.legacy_purged
+            }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    def reconcile(self, store, page_size=500):
+        """
+        Bring the manifest in line with a store using paged ID-only fetches
+
+        Args:
+            store: LocalVectorIndex or ChromaDB collection
+            page_size: IDs fetched per request
+
+        Returns:
+            Tuple of (added, removed) counts
+        """
+        stored_ids = set()
+        offset = 0
+        while True:
+            page = store.get(include=[], limit=page_size, offset=offset).get('ids', [])
+            stored_ids.update(page)
+            if len(page) < page_size:
+                break
+            offset += page_size
+
+        with self._lock:
+            missing = [doc_id for doc_id in self._entries if doc_id not in stored_ids]
+            unknown = [doc_id for doc_id in stored_ids if doc_id not in self._entries]
+        self.remove(missing)
+
+        # Only IDs the manifest has never seen need their metadata fetched
+        for i in range(0, len(unknown), page_size):
+            chunk = unknown[i:i + page_size]
+            result = store.get(ids=chunk, include=['metadatas'])
+            self.record(result.get('ids', []), result.get('metadatas', []))
+
+        self.last_reconcile = datetime.now().isoformat()
+        self.save()
+        return len(unknown), len(missing)
+
+    def start_background_reconcile(self, store, interval_seconds=3600, page_size=500):
+        """Periodically reconcile against the store on a daemon thread"""
+        if self._reconcile_thread is not None:
+            return self._reconcile_thread
+
+        def run():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    added, removed = self.reconcile(store, page_size=page_size)
+                    if added or removed:
+                        print(f"🔁 Manifest reconciled: +{added} / -{removed} records")
+                except Exception as e:
+                    print(f"⚠️  Manifest reconciliation failed: {e}")
+
+        self._reconcile_thread = threading.Thread(target=run, name="manifest-reconcile", daemon=True)
+        self._reconcile_thread.start()
+        return self._reconcile_thread
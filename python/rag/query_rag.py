@@ -2,74 +2,126 @@
 RAG Query Module - Query vector DB and generate responses with Gemini AI
 """
 import os
+import re
 import json
-from sentence_transformers import SentenceTransformer
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+from rag.embedding_service import get_embedding_service
+from rag.response_cache import SemanticResponseCache
+from rag.admission import AdmissionController
+from rag.single_flight import SingleFlight
+from rag.filters import normalize_filters, extract_filters, to_where, filters_key
 
 load_dotenv()
 
+NO_RESULTS_MESSAGE = "I couldn't find relevant information in the database. Please try rephrasing your question or ask about Indian government policies, infrastructure, or development projects."
+
 class RAGQuery:
     def __init__(self, collection):
         """
         Initialize RAG query system
         
         Args:
-            collection: ChromaDB collection instance
+            collection: LocalVectorIndex or ChromaDB collection instance
         """
         self.collection = collection
         
-        # Load embedding model
-        print("📥 Loading embedding model for queries...")
-        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        # Shared embedding model (loaded once per process, micro-batched)
+        self.embedder = get_embedding_service()
         
         # Configure Gemini API
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         if not self.gemini_api_key:
             raise ValueError("❌ GEMINI_API_KEY not found in .env")
         
+        # Imported here so importing this module (and the API) stays cheap
+        import google.generativeai as genai
+        
         genai.configure(api_key=self.gemini_api_key)
         self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
+        
+        # Answers for near-identical questions, invalidated when the data changes
+        self.data_version = None
+        self.response_cache = SemanticResponseCache(
+            similarity_threshold=float(os.getenv("CHAT_CACHE_SIMILARITY", "0.92")),
+            max_entries=int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "512")),
+            ttl_seconds=int(os.getenv("CHAT_CACHE_TTL_SECONDS", str(6 * 3600)))
+        )
+        
+        # Bounded concurrent Gemini calls with a bounded wait queue
+        self.llm_limiter = AdmissionController(
+            max_in_flight=int(os.getenv("CHAT_MAX_IN_FLIGHT", "4")),
+            max_queue=int(os.getenv("CHAT_MAX_QUEUE", "16")),
+            queue_timeout=float(os.getenv("CHAT_QUEUE_TIMEOUT", "10"))
+        )
+        
+        # Identical in-flight questions share one pipeline execution
+        self._flight = SingleFlight()
         print("✅ RAG Query system initialized")
     
-    def search_vector_db(self, query, top_k=5):
+    def set_data_version(self, data_version):
+        """Record the current dataset version; cached answers from older versions are dropped"""
+        if data_version != self.data_version:
+            self.data_version = data_version
+            self.response_cache.invalidate(data_version)
+    
+    def cache_stats(self):
+        """Response cache and embedding batching statistics"""
+        return {
+            'response_cache': self.response_cache.stats(),
+            'embedding_batches': self.embedder.stats(),
+            'llm_admission': self.llm_limiter.stats(),
+            'coalescing': self._flight.stats()
+        }
+    
+    def search_vector_db(self, query, top_k=5, query_embedding=None, where=None):
         """
         Search vector DB for relevant documents
         
         Args:
             query: User query string
             top_k: Number of results to return
+            query_embedding: Precomputed query embedding (encoded from query if None)
+            where: Metadata filter applied inside the index before scoring
             
         Returns:
             List of relevant documents with metadata
         """
         try:
             # Generate query embedding
-            query_embedding = self.model.encode(query).tolist()
+            if query_embedding is None:
+                query_embedding = self.embedder.encode_query(query)
             
-            # Query ChromaDB
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k
-            )
-            
-            # Format results
-            documents = []
-            if results and 'documents' in results:
-                for i in range(len(results['documents'][0])):
-                    doc = {
-                        'content': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i] if 'metadatas' in results else {},
-                        'distance': results['distances'][0][i] if 'distances' in results else None
-                    }
-                    documents.append(doc)
+            # Query the vector index (in-process or ChromaDB)
+            query_args = {
+                'query_embeddings': [list(map(float, query_embedding))],
+                'n_results': top_k
+            }
+            if where:
+                query_args['where'] = where
+            results = self.collection.query(**query_args)
             
-            return documents
+            return self._format_documents(results, 0)
             
         except Exception as e:
             print(f"❌ Error searching vector DB: {e}")
             return []
     
+    def _format_documents(self, results, row):
+        """Documents for one query row of a collection.query() result"""
+        documents = []
+        if results and results.get('documents'):
+            for i in range(len(results['documents'][row])):
+                doc = {
+                    'content': results['documents'][row][i],
+                    'metadata': results['metadatas'][row][i] if results.get('metadatas') else {},
+                    'distance': results['distances'][row][i] if results.get('distances') else None
+                }
+                documents.append(doc)
+        return documents
+    
     def generate_response(self, query, context_docs):
         """
         Generate AI response using Gemini with retrieved context
@@ -82,14 +134,22 @@ class RAGQuery:
             AI-generated response
         """
         try:
-            # Build context from retrieved documents
-            context = "\n\n".join([
-                f"Document {i+1}:\n{doc['content']}"
-                for i, doc in enumerate(context_docs)
-            ])
+            return self._generate_text(query, context_docs)
             
-            # Create prompt for Gemini
-            prompt = f"""You are an AI assistant helping users understand Indian government policies, infrastructure projects, and development initiatives.
+        except Exception as e:
+            print(f"❌ Error generating Gemini response: {e}")
+            return f"I apologize, but I encountered an error generating a response: {str(e)}"
+    
+    def _build_prompt(self, query, context_docs):
+        """Build the Gemini prompt from the question and retrieved documents"""
+        # Build context from retrieved documents
+        context = "\n\n".join([
+            f"Document {i+1}:\n{doc['content']}"
+            for i, doc in enumerate(context_docs)
+        ])
+        
+        # Create prompt for Gemini
+        return f"""You are an AI assistant helping users understand Indian government policies, infrastructure projects, and development initiatives.
 
 Use the following context from official sources to answer the user's question. If the context doesn't contain enough information, say so and provide general knowledge if appropriate.
 
@@ -99,78 +159,366 @@ Context:
 User Question: {query}
 
 Please provide a clear, accurate, and helpful response based on the context above. Include specific details like ministries, locations, dates, and funding amounts when available."""
-            
-            # Generate response with Gemini
-            response = self.gemini_model.generate_content(prompt)
-            
-            return response.text
-            
-        except Exception as e:
-            print(f"❌ Error generating Gemini response: {e}")
-            return f"I apologize, but I encountered an error generating a response: {str(e)}"
     
-    def query(self, user_query, top_k=5, return_sources=True):
+    def _generate_text(self, query, context_docs):
+        """Call Gemini (raises on failure)"""
+        response = self.gemini_model.generate_content(self._build_prompt(query, context_docs))
+        return response.text
+    
+    def _flight_key(self, user_query, top_k, return_sources, filters, auto_filters):
+        """Key under which identical concurrent queries are coalesced"""
+        normalized = re.sub(r"\s+", " ", user_query.strip().lower()).rstrip("?!. ")
+        return (normalized, top_k, return_sources, filters_key(filters), auto_filters, self.data_version)
+    
+    def _resolve_filters(self, user_query, filters, auto_filters):
+        """
+        Combine explicit filters with ones extracted from the question
+        
+        Returns:
+            Tuple of (combined filters, explicit-only filters); explicit values win
+        """
+        explicit = normalize_filters(filters)
+        combined = dict(extract_filters(user_query)) if auto_filters else {}
+        combined.update(explicit)
+        return combined, explicit
+    
+    def _retrieve(self, user_query, top_k, query_embedding, combined, explicit):
+        """
+        Filtered retrieval; when extracted filters leave fewer than top_k matches, the
+        remaining slots are filled from a search without them
+        
+        Returns:
+            Tuple of (documents, filters actually applied)
+        """
+        documents = self.search_vector_db(user_query, top_k=top_k, query_embedding=query_embedding,
+                                          where=to_where(combined))
+        if len(documents) < top_k and combined != explicit:
+            print(f"   Only {len(documents)} matches with extracted filters, filling up without them...")
+            seen = {doc['content'] for doc in documents}
+            relaxed = self.search_vector_db(user_query, top_k=top_k, query_embedding=query_embedding,
+                                            where=to_where(explicit))
+            documents += [doc for doc in relaxed if doc['content'] not in seen][:top_k - len(documents)]
+            return documents, explicit
+        return documents, combined
+    
+    def query(self, user_query, top_k=5, return_sources=True, filters=None, auto_filters=True):
         """
         Complete RAG query pipeline
         
+        Concurrent callers asking the same normalized question share one execution
+        (and its failure, if it fails).
+        
         Args:
             user_query: User's question
             top_k: Number of documents to retrieve
             return_sources: Whether to include source documents in response
+            filters: Metadata filters (type, ministry, location, date_from, date_to)
+            auto_filters: Also extract obvious filters from the question text
             
         Returns:
             Dictionary with response and optional source documents
         """
+        filters = normalize_filters(filters)
+        key = self._flight_key(user_query, top_k, return_sources, filters, auto_filters)
+        return self._flight.do(key, lambda: self._run_query(user_query, top_k, return_sources, filters, auto_filters))
+    
+    def _run_query(self, user_query, top_k, return_sources, filters, auto_filters):
+        """Synchronous pipeline: cache, retrieval, generation"""
         print(f"\n🔍 Processing query: {user_query}")
+        combined, explicit = self._resolve_filters(user_query, filters, auto_filters)
         
-        # Step 1: Search vector DB
-        print(f"   Searching vector DB (top {top_k} results)...")
-        documents = self.search_vector_db(user_query, top_k=top_k)
+        # Step 0: Serve near-identical questions from the response cache
+        query_embedding = self.embedder.encode_query(user_query)
+        cache_scope = (top_k, return_sources, filters_key(combined))
+        cached = self.response_cache.lookup(query_embedding, self.data_version, scope=cache_scope)
+        if cached is not None:
+            print("   ⚡ Served from response cache")
+            return dict(cached, query=user_query, cached=True)
+        
+        # Step 1: Search vector DB (filters applied inside the index)
+        print(f"   Searching vector DB (top {top_k} results, filters: {combined or 'none'})...")
+        documents, applied = self._retrieve(user_query, top_k, query_embedding, combined, explicit)
         
         if not documents:
             return {
-                'response': "I couldn't find relevant information in the database. Please try rephrasing your question or ask about Indian government policies, infrastructure, or development projects.",
+                'response': NO_RESULTS_MESSAGE,
                 'sources': []
             }
         
         print(f"   ✅ Found {len(documents)} relevant documents")
         
-        # Step 2: Generate response with Gemini
+        # Step 2: Generate response with Gemini (raises ChatOverloaded if saturated)
         print("   Generating AI response with Gemini...")
-        response_text = self.generate_response(user_query, documents)
-        print("   ✅ Response generated")
+        with self.llm_limiter.slot():
+            try:
+                response_text = self._generate_text(user_query, documents)
+                cacheable = True
+                print("   ✅ Response generated")
+            except Exception as e:
+                print(f"❌ Error generating Gemini response: {e}")
+                response_text = f"I apologize, but I encountered an error generating a response: {str(e)}"
+                cacheable = False
+        
+        return self._build_result(user_query, documents, response_text, return_sources, applied,
+                                  query_embedding if cacheable else None, cache_scope)
+    
+    async def aquery(self, user_query, top_k=5, return_sources=True, filters=None, auto_filters=True):
+        """
+        Asynchronous RAG query pipeline
+        
+        Retrieval and the Gemini call run in threads off the event loop. Flask runs each async
+        view on its own short-lived loop, so the loop-bound async Gemini client is not used;
+        under WSGI the request thread still waits for the answer.
+        
+        Args:
+            user_query: User's question
+            top_k: Number of documents to retrieve
+            return_sources: Whether to include source documents in response
+            filters: Metadata filters (type, ministry, location, date_from, date_to)
+            auto_filters: Also extract obvious filters from the question text
+            
+        Returns:
+            Dictionary with response and optional source documents
+        """
+        filters = normalize_filters(filters)
+        key = self._flight_key(user_query, top_k, return_sources, filters, auto_filters)
+        call, leader = self._flight.begin(key)
+        if not leader:
+            return await asyncio.to_thread(call.wait)
+        
+        try:
+            result = await self._run_aquery(user_query, top_k, return_sources, filters, auto_filters)
+        except BaseException as e:
+            self._flight.finish(key, call, error=e)
+            raise
+        self._flight.finish(key, call, result=result)
+        return result
+    
+    async def _run_aquery(self, user_query, top_k, return_sources, filters, auto_filters):
+        """Asynchronous pipeline: cache, retrieval, generation"""
+        print(f"\n🔍 Processing query (async): {user_query}")
+        combined, explicit = self._resolve_filters(user_query, filters, auto_filters)
+        
+        query_embedding = await asyncio.wrap_future(self.embedder.submit(user_query))
+        cache_scope = (top_k, return_sources, filters_key(combined))
+        cached = self.response_cache.lookup(query_embedding, self.data_version, scope=cache_scope)
+        if cached is not None:
+            print("   ⚡ Served from response cache")
+            return dict(cached, query=user_query, cached=True)
+        
+        documents, applied = await asyncio.to_thread(
+            self._retrieve, user_query, top_k, query_embedding, combined, explicit
+        )
+        
+        if not documents:
+            return {
+                'response': NO_RESULTS_MESSAGE,
+                'sources': []
+            }
+        
+        acquired_at = await self.llm_limiter.acquire_async()
+        try:
+            try:
+                # The sync client: grpc.aio clients are bound to the loop that created them
+                response = await asyncio.to_thread(
+                    self.gemini_model.generate_content, self._build_prompt(user_query, documents)
+                )
+                response_text = response.text
+                cacheable = True
+                print("   ✅ Response generated")
+            except Exception as e:
+                print(f"❌ Error generating Gemini response: {e}")
+                response_text = f"I apologize, but I encountered an error generating a response: {str(e)}"
+                cacheable = False
+        finally:
+            self.llm_limiter.release(acquired_at)
+        
+        return self._build_result(user_query, documents, response_text, return_sources, applied,
+                                  query_embedding if cacheable else None, cache_scope)
+    
+    def query_batch(self, queries, top_k=5, return_sources=True, filters=None, max_workers=4):
+        """
+        Answer many questions at once
+        
+        All questions are embedded in one model call and retrieved with one multi-vector
+        index query; answers are generated with bounded parallelism.
+        
+        Args:
+            queries: List of question strings
+            top_k: Number of documents to retrieve per question
+            return_sources: Whether to include source documents in each result
+            filters: Metadata filters shared by every question
+            max_workers: Concurrent Gemini calls for this batch
+            
+        Returns:
+            List aligned with queries; each item is a result dict with 'success',
+            or {'success': False, 'query', 'error'} for that question alone
+        """
+        filters = normalize_filters(filters)
+        print(f"\n🔍 Processing batch of {len(queries)} queries")
+        if not queries:
+            return []
+        
+        results = [None] * len(queries)
+        embeddings = self.embedder.encode(list(queries))
+        cache_scope = (top_k, return_sources, filters_key(filters))
+        
+        # Serve what we can from the response cache
+        pending = []
+        for i, (user_query, embedding) in enumerate(zip(queries, embeddings)):
+            cached = self.response_cache.lookup(embedding, self.data_version, scope=cache_scope)
+            if cached is not None:
+                results[i] = dict(cached, query=user_query, cached=True, success=True)
+            else:
+                pending.append(i)
+        
+        if not pending:
+            return results
+        
+        # One multi-vector retrieval for every remaining question
+        try:
+            query_args = {
+                'query_embeddings': [list(map(float, embeddings[i])) for i in pending],
+                'n_results': top_k
+            }
+            where = to_where(filters)
+            if where:
+                query_args['where'] = where
+            retrieved = self.collection.query(**query_args)
+        except Exception as e:
+            print(f"❌ Error searching vector DB: {e}")
+            for i in pending:
+                results[i] = {'success': False, 'query': queries[i], 'error': f"Retrieval failed: {e}"}
+            return results
+        
+        def answer(row, i):
+            user_query = queries[i]
+            documents = self._format_documents(retrieved, row)
+            if not documents:
+                return {'response': NO_RESULTS_MESSAGE, 'query': user_query, 'sources': [], 'success': True}
+            try:
+                with self.llm_limiter.slot():
+                    response_text = self._generate_text(user_query, documents)
+            except Exception as e:
+                return {'success': False, 'query': user_query, 'error': str(e)}
+            result = self._build_result(user_query, documents, response_text, return_sources, filters,
+                                        embeddings[i], cache_scope)
+            return dict(result, success=True)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {i: pool.submit(answer, row, i) for row, i in enumerate(pending)}
+            for i, future in futures.items():
+                results[i] = future.result()
         
-        # Format response
+        print(f"   ✅ Batch complete: {sum(1 for r in results if r.get('success'))}/{len(queries)} succeeded")
+        return results
+    
+    def _build_result(self, user_query, documents, response_text, return_sources, applied_filters,
+                      query_embedding, cache_scope):
+        """Format a pipeline result and cache it (when a query embedding is given)"""
         result = {
             'response': response_text,
-            'query': user_query
+            'query': user_query,
+            'filters': applied_filters
         }
         
         if return_sources:
-            # Extract source information
-            sources = []
-            for doc in documents:
-                metadata = doc.get('metadata', {})
-                source = {
-                    'title': metadata.get('title', 'Unknown'),
-                    'type': metadata.get('type', 'unknown'),
-                    'ministry': metadata.get('ministry', 'Unknown'),
-                    'date': metadata.get('date', ''),
-                    'source': metadata.get('source', 'Unknown'),
-                    'relevance': 1 - (doc.get('distance', 1) if doc.get('distance') else 1)  # Convert distance to relevance score
-                }
-                sources.append(source)
-            
+            sources = self._format_sources(documents)
             result['sources'] = sources
             result['source_count'] = len(sources)
         
+        if query_embedding is not None:
+            self.response_cache.store(query_embedding, self.data_version, result, scope=cache_scope)
+        
         return result
+    
+    def query_stream(self, user_query, top_k=5, filters=None, auto_filters=True):
+        """
+        Streaming RAG query pipeline
+        
+        Args:
+            user_query: User's question
+            top_k: Number of documents to retrieve
+            filters: Metadata filters (type, ministry, location, date_from, date_to)
+            auto_filters: Also extract obvious filters from the question text
+            
+        Yields:
+            (event, payload) tuples: one 'sources' event as soon as retrieval finishes,
+            'token' events as Gemini produces text, then a final 'done' summary
+            (or 'error' if generation fails)
+        """
+        print(f"\n🔍 Streaming query: {user_query}")
+        combined, explicit = self._resolve_filters(user_query, filters, auto_filters)
+        
+        query_embedding = self.embedder.encode_query(user_query)
+        cache_scope = (top_k, True, filters_key(combined))
+        cached = self.response_cache.lookup(query_embedding, self.data_version, scope=cache_scope)
+        if cached is not None:
+            print("   ⚡ Served from response cache")
+            yield 'sources', {'sources': cached.get('sources', []), 'filters': cached.get('filters', {})}
+            yield 'token', {'text': cached['response']}
+            yield 'done', {'query': user_query, 'source_count': cached.get('source_count', 0), 'cached': True}
+            return
+        
+        documents, applied = self._retrieve(user_query, top_k, query_embedding, combined, explicit)
+        sources = self._format_sources(documents)
+        
+        if not documents:
+            yield 'sources', {'sources': sources, 'filters': applied}
+            yield 'token', {'text': NO_RESULTS_MESSAGE}
+            yield 'done', {'query': user_query, 'source_count': 0, 'cached': False}
+            return
+        
+        # Admission happens before the first event, so callers can still reject with 429/503
+        acquired_at = self.llm_limiter.acquire()
+        try:
+            yield 'sources', {'sources': sources, 'filters': applied}
+            
+            parts = []
+            try:
+                stream = self.gemini_model.generate_content(self._build_prompt(user_query, documents), stream=True)
+                for chunk in stream:
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. safety metadata) raise on .text
+                        continue
+                    if text:
+                        parts.append(text)
+                        yield 'token', {'text': text}
+            except Exception as e:
+                print(f"❌ Error streaming Gemini response: {e}")
+                yield 'error', {'message': f"I apologize, but I encountered an error generating a response: {str(e)}"}
+                return
+        finally:
+            self.llm_limiter.release(acquired_at)
+        
+        print("   ✅ Response streamed")
+        self._build_result(user_query, documents, "".join(parts), True, applied, query_embedding, cache_scope)
+        
+        yield 'done', {'query': user_query, 'source_count': len(sources), 'cached': False}
+    
+    def _format_sources(self, documents):
+        """Extract source information from retrieved documents"""
+        sources = []
+        for doc in documents:
+            metadata = doc.get('metadata', {})
+            source = {
+                'title': metadata.get('title', 'Unknown'),
+                'type': metadata.get('type', 'unknown'),
+                'ministry': metadata.get('ministry', 'Unknown'),
+                'date': metadata.get('date', ''),
+                'source': metadata.get('source', 'Unknown'),
+                'relevance': 1 - (doc.get('distance', 1) if doc.get('distance') else 1)  # Convert distance to relevance score
+            }
+            sources.append(source)
+        return sources
 
 # Global instance will be initialized by app.py
 _rag_query = None
 
 def initialize_rag(collection):
-    """Initialize RAG query system with ChromaDB collection"""
+    """Initialize RAG query system with a vector index or ChromaDB collection"""
     global _rag_query
     try:
         _rag_query = RAGQuery(collection)
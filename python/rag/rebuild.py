@@ -0,0 +1,347 @@
+"""
+Vector DB Rebuild - Bulk rebuild/backfill into a shadow index with resumable checkpoints
+Encodes across all CPU cores, checkpoints progress so an interrupted run resumes where
+it stopped, and swaps the finished generation in through the vector alias.
+The source is frozen when a rebuild starts, so a resumed run skips exactly the records
+already processed even if fetches reorder or rewrite the live data meanwhile
+
+Usage (from the python/ directory):
+    python -m rag.rebuild --workers 4              # records from data/store
+    python -m rag.rebuild --source data/backfill.jsonl
+    python -m rag.rebuild --restart                # discard an unfinished rebuild
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from datetime import datetime
+
+from rag.build_vector_db import VectorDBBuilder
+from rag.vector_index import LocalVectorIndex
+from rag.manifest import IndexManifest
+from rag.adaptive_batch import AdaptiveBatchSizer
+from rag.record_stream import iter_records
+from rag.vector_alias import VECTOR_ALIAS_PATH, read_alias, write_alias
+
+CHECKPOINT_PATH = os.getenv("REBUILD_CHECKPOINT_PATH", "data/rebuild_checkpoint.json")
+
+
+def _generation_path(path, build_id):
+    """data/vector_index.npy -> data/vector_index.gen-<build_id>.npy (also from an older generation)"""
+    base, ext = os.path.splitext(path)
+    return f"{base.split('.gen-')[0]}.gen-{build_id}{ext}"
+
+
+class Rebuilder:
+    def __init__(self, builder, source, workers=None, chunk_size=4096, checkpoint_every=20000):
+        """
+        Args:
+            builder: VectorDBBuilder for the live generation (model, cache, Chroma client)
+            source: Data file (JSON/JSONL) or "store" for the fetcher's record storage
+            workers: Encoding processes (defaults to the CPU count)
+            chunk_size: Records encoded per multi-process call
+            checkpoint_every: Records between checkpoints
+        """
+        self.builder = builder
+        self.source = source
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.checkpoint_every = checkpoint_every
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def load_checkpoint(self):
+        """Unfinished rebuild of the same source, if any"""
+        try:
+            with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return None
+        if checkpoint.get("source") != self.source:
+            print(f"⚠️  Ignoring checkpoint for a different source ({checkpoint.get('source')})")
+            return None
+        return checkpoint
+
+    def save_checkpoint(self, checkpoint):
+        directory = os.path.dirname(CHECKPOINT_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = CHECKPOINT_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, CHECKPOINT_PATH)
+
+    def new_checkpoint(self):
+        """Fresh generation paths next to the live index"""
+        build_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        return {
+            "build_id": build_id,
+            "source": self.source,
+            "index_path": _generation_path(self.builder.index.index_path, build_id),
+            "manifest_path": _generation_path(self.builder.manifest.path, build_id),
+            "collection_name": f"{self.builder.collection_name.split('.gen-')[0]}.gen-{build_id}",
+            "processed": 0,
+            "started_at": datetime.now().isoformat()
+        }
+
+    # ------------------------------------------------------------------
+    # Rebuild
+    # ------------------------------------------------------------------
+
+    def freeze_source(self, checkpoint):
+        """
+        Pin the records this rebuild reads (path stored in the checkpoint)
+
+        The store is written out as JSONL, since every fetch puts its newest batch first;
+        a data file is hard-linked, which keeps the old contents when it is replaced by rename
+        """
+        directory = os.path.dirname(CHECKPOINT_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"rebuild_source.gen-{checkpoint['build_id']}")
+        if self.source == "store":
+            from storage import RecordStorage
+            path = base + ".jsonl"
+            records = RecordStorage(os.getenv("STORAGE_DIR", "data/store")).load() or []
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            os.replace(path + ".tmp", path)
+        else:
+            path = base + os.path.splitext(self.source)[1]
+            try:
+                os.link(self.source, path)
+            except OSError:
+                shutil.copy2(self.source, path)
+        checkpoint["source_path"] = path
+
+    @staticmethod
+    def discard_source(checkpoint):
+        """Delete a checkpoint's frozen source"""
+        path = checkpoint.get("source_path")
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def records(self, checkpoint=None):
+        """Source records in a stable order (the frozen copy when there is one)"""
+        if checkpoint and checkpoint.get("source_path"):
+            return iter_records(checkpoint["source_path"])
+        if self.source == "store":
+            from storage import RecordStorage
+            records = RecordStorage(os.getenv("STORAGE_DIR", "data/store")).load()
+            return iter(records or [])
+        return iter_records(self.source)
+
+    def run(self, prune_previous=False):
+        """Build (or resume) the shadow generation and swap it in; returns True on success"""
+        checkpoint = self.load_checkpoint()
+        if checkpoint:
+            print(f"🔁 Resuming rebuild {checkpoint['build_id']} after {checkpoint['processed']} records")
+        else:
+            checkpoint = self.new_checkpoint()
+            print(f"🆕 Starting rebuild {checkpoint['build_id']}")
+            self.freeze_source(checkpoint)
+
+        index = LocalVectorIndex(checkpoint["index_path"])
+        manifest = IndexManifest(checkpoint["manifest_path"])
+        collection = None
+        if self.builder.client is not None:
+            collection = self.builder.client.get_or_create_collection(name=checkpoint["collection_name"])
+        targets = (index, collection, manifest)
+        self.save_checkpoint(checkpoint)
+
+        sizer = AdaptiveBatchSizer(
+            initial=self.builder.initial_batch_size,
+            maximum=self.builder.max_batch_size,
+            target_seconds=self.builder.target_upload_seconds
+        )
+        pool = self._start_pool()
+        started = time.time()
+        done_this_run = 0
+        since_checkpoint = 0
+
+        try:
+            records = self.records(checkpoint)
+            # Records before the checkpoint are already in the shadow generation
+            for _ in range(checkpoint["processed"]):
+                if next(records, None) is None:
+                    break
+
+            position = checkpoint["processed"]
+            while True:
+                chunk = [record for _, record in zip(range(self.chunk_size), records)]
+                if not chunk:
+                    break
+
+                prepared = [self.builder._prepare(record, position + i) for i, record in enumerate(chunk)]
+                texts = [text for text, _, _ in prepared]
+                vectors = self._encode(texts, pool)
+
+                # Batch size adapts between uploads, so each batch starts where the last one ended
+                start = 0
+                while start < len(prepared):
+                    end = start + sizer.size
+                    ids = [doc_id for _, doc_id, _ in prepared[start:end]]
+                    metadatas = [metadata for _, _, metadata in prepared[start:end]]
+                    stored = self.builder._upload_batch(ids, vectors[start:end], texts[start:end], metadatas, sizer, targets)
+                    if stored < len(ids):
+                        raise RuntimeError(f"Upload failed at record {position + start}; rerun to resume")
+                    start = end
+
+                position += len(chunk)
+                done_this_run += len(chunk)
+                since_checkpoint += len(chunk)
+                elapsed = max(time.time() - started, 1e-6)
+                print(f"   ✅ {position} records ({done_this_run / elapsed:.1f} records/s)")
+
+                if since_checkpoint >= self.checkpoint_every:
+                    self._checkpoint(index, manifest, checkpoint, position)
+                    since_checkpoint = 0
+
+            if since_checkpoint:
+                self._checkpoint(index, manifest, checkpoint, position)
+        finally:
+            self._stop_pool(pool)
+
+        if position == 0:
+            print("⚠️  No records in source, keeping the current generation")
+            self.discard_source(checkpoint)
+            os.remove(CHECKPOINT_PATH)
+            return False
+
+        self._swap(checkpoint, prune_previous)
+        self.discard_source(checkpoint)
+        os.remove(CHECKPOINT_PATH)
+        print(f"✅ Rebuild {checkpoint['build_id']} complete: {index.count()} records in {time.time() - started:.1f}s")
+        return True
+
+    def _checkpoint(self, index, manifest, checkpoint, position):
+        """Persist the shadow generation, then record how far it got"""
+        index.save()
+        manifest.mark_ingest()
+        manifest.save()
+        checkpoint["processed"] = position
+        checkpoint["updated_at"] = datetime.now().isoformat()
+        self.save_checkpoint(checkpoint)
+        print(f"   💾 Checkpoint at {position} records")
+
+    def _swap(self, checkpoint, prune_previous):
+        """Point the alias at the finished generation"""
+        previous = read_alias() or {
+            "index_path": self.builder.index.index_path,
+            "manifest_path": self.builder.manifest.path,
+            "collection_name": self.builder.collection_name
+        }
+        write_alias({
+            "index_path": checkpoint["index_path"],
+            "manifest_path": checkpoint["manifest_path"],
+            "collection_name": checkpoint["collection_name"],
+            "build_id": checkpoint["build_id"],
+            "source": checkpoint["source"],
+            "swapped_at": datetime.now().isoformat()
+        })
+        print(f"🔀 {VECTOR_ALIAS_PATH} now points to generation {checkpoint['build_id']}")
+        print("   Running servers pick it up on their next restart")
+
+        if prune_previous:
+            self._prune(previous)
+        else:
+            print(f"   Previous generation kept: {previous['index_path']}")
+
+    def _prune(self, previous):
+        """Delete the generation that was live before the swap"""
+        index_path = previous.get("index_path")
+        if index_path:
+            for path in LocalVectorIndex.saved_files(index_path) + (previous.get("manifest_path"),):
+                if path and os.path.exists(path):
+                    os.remove(path)
+        if self.builder.client is not None and previous.get("collection_name"):
+            try:
+                self.builder.client.delete_collection(name=previous["collection_name"])
+            except Exception as e:
+                print(f"⚠️  Could not delete collection {previous['collection_name']}: {e}")
+        print(f"🗑️  Pruned previous generation ({index_path})")
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def _start_pool(self):
+        """SentenceTransformer multi-process pool (None when using a single worker)"""
+        if self.workers <= 1:
+            return None
+        print(f"🧵 Starting {self.workers} encoding processes")
+        return self.builder.embedder.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+
+    def _stop_pool(self, pool):
+        if pool is not None:
+            self.builder.embedder.model.stop_multi_process_pool(pool)
+
+    def _encode(self, texts, pool):
+        """Embed a chunk, reusing cached vectors and spreading the rest over the pool"""
+        cache = self.builder.embedding_cache
+        vectors = cache.get_many(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            if pool is not None:
+                encoded = self.builder.embedder.model.encode_multi_process(missing_texts, pool)
+            else:
+                encoded = self.builder.embedder.encode(missing_texts)
+            for i, vector in zip(missing, encoded):
+                vectors[i] = vector
+            cache.put_many(missing_texts, encoded)
+
+        return [vector.tolist() for vector in vectors]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the vector database into a new generation")
+    parser.add_argument("--source", default="store",
+                        help='JSON/JSONL data file, or "store" for data/store (default: store)')
+    parser.add_argument("--workers", type=int, default=None, help="Encoding processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Records encoded per chunk")
+    parser.add_argument("--checkpoint-every", type=int, default=20000, help="Records between checkpoints")
+    parser.add_argument("--restart", action="store_true", help="Discard an unfinished rebuild and start over")
+    parser.add_argument("--prune-previous", action="store_true", help="Delete the previous generation after the swap")
+    args = parser.parse_args(argv)
+
+    if args.restart and os.path.exists(CHECKPOINT_PATH):
+        with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+            Rebuilder.discard_source(json.load(f))
+        os.remove(CHECKPOINT_PATH)
+        print("🧹 Discarded previous checkpoint")
+
+    if args.source != "store" and os.path.exists(args.source):
+        # The legacy JSON export is only rewritten with EXPORT_LEGACY_JSON=true
+        from storage import RecordStorage
+        last_updated = RecordStorage(os.getenv("STORAGE_DIR", "data/store")).last_updated()
+        if last_updated and datetime.fromtimestamp(os.path.getmtime(args.source)) < last_updated:
+            print(f"⚠️  {args.source} is older than data/store (updated {last_updated.isoformat()});")
+            print("   use --source store to rebuild from the current records")
+
+    rebuilder = Rebuilder(
+        VectorDBBuilder(),
+        args.source,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        checkpoint_every=args.checkpoint_every
+    )
+    try:
+        return 0 if rebuilder.run(prune_previous=args.prune_previous) else 1
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted; rerun the same command to resume from the last checkpoint")
+        return 130
+    except Exception as e:
+        print(f"❌ Rebuild failed: {e}")
+        print("   Rerun the same command to resume from the last checkpoint")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
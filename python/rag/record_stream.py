@@ -0,0 +1,128 @@
+"""
+Record Stream - Incremental readers for ingestion files
+Yields records one at a time from JSONL files, bare JSON arrays or the
+{"last_updated": ..., "data": [...]} cache format without loading the whole file
+"""
+import json
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+
+
+def iter_records(file_path, header=None, chunk_size=1 << 16):
+    """
+    Stream records from a data file
+
+    Args:
+        file_path: .jsonl file (one record per line) or JSON file (array, or object with a 'data' array)
+        header: Optional dict that receives the other top-level fields of a JSON object
+        chunk_size: Characters read per chunk
+
+    Yields:
+        Record dicts
+
+    Raises:
+        ValueError: If the file is not in a supported layout
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if file_path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        reader = _ChunkReader(f, chunk_size)
+        first = reader.peek()
+        if first == '[':
+            yield from _iter_array(reader)
+        elif first == '{':
+            yield from _iter_object_data(reader, header)
+        else:
+            raise ValueError(f"Unsupported data file layout in {file_path}")
+
+
+class _ChunkReader:
+    """Buffered character reader that keeps only the unparsed tail in memory"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Read another chunk (False at end of file)"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        """Consume the next non-whitespace character, which must be one of chars"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next JSON value, reading more chunks until it is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number is only complete once a delimiter follows it
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if (end == len(self.buffer) or self.buffer[end] in _NUMBER_CHARS) and self.fill():
+                    continue
+            self.pos = end
+            return value
+
+
+def _iter_array(reader):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+
+def _iter_object_data(reader, header):
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'data' and reader.peek() == '[':
+            yield from _iter_array(reader)
+        else:
+            value = reader.value()
+            if header is not None:
+                header[key] = value
+        if reader.expect(',}') == '}':
+            return
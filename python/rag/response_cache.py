@@ -0,0 +1,113 @@
+"""
+Semantic Response Cache - Reuse chat answers for identical and near-identical questions
+Entries are matched by query-embedding cosine similarity and scoped to a data version
+"""
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class SemanticResponseCache:
+    def __init__(self, similarity_threshold=0.92, max_entries=512, ttl_seconds=6 * 3600):
+        """
+        Initialize response cache
+
+        Args:
+            similarity_threshold: Minimum cosine similarity for a hit
+            max_entries: LRU bound on cached answers (bounds memory)
+            ttl_seconds: Age after which an answer is no longer served
+        """
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> entry dict
+        self._next_key = 0
+        self.data_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, embedding, data_version, scope=None):
+        """
+        Find a cached answer for a query embedding
+
+        Args:
+            embedding: Query embedding
+            data_version: Current data version; entries from other versions never match
+            scope: Extra parameters that must match exactly (e.g. top_k)
+
+        Returns:
+            Cached result dict or None
+        """
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            self._check_version(data_version)
+            self._drop_expired()
+
+            candidates = [(key, entry) for key, entry in self._entries.items() if entry['scope'] == scope]
+            if candidates:
+                matrix = np.stack([entry['vector'] for _, entry in candidates])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    key, entry = candidates[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry['result']
+
+            self.misses += 1
+            return None
+
+    def store(self, embedding, data_version, result, scope=None):
+        """Cache an answer for a query embedding"""
+        with self._lock:
+            self._check_version(data_version)
+            self._entries[self._next_key] = {
+                'vector': self._normalize(embedding),
+                'scope': scope,
+                'result': result,
+                'created': time.monotonic()
+            }
+            self._next_key += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, data_version=None):
+        """Drop every entry (optionally moving to a new data version)"""
+        with self._lock:
+            self._entries.clear()
+            self.data_version = data_version
+
+    def stats(self):
+        """Hit/miss counters and size"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'data_version': self.data_version
+            }
+
+    def _check_version(self, data_version):
+        """Answers computed on older data are discarded as soon as the version moves"""
+        if data_version != self.data_version:
+            self._entries.clear()
+            self.data_version = data_version
+
+    def _drop_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry['created'] < cutoff]
+        for key in expired:
+            del self._entries[key]
+
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -0,0 +1,78 @@
+"""
+Single Flight - Coalesce identical concurrent calls into one execution
+Every caller that arrives while a call for the same key is running receives its result
+(or its exception) instead of starting another one
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        """Block until the leader finishes; re-raise its failure"""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def begin(self, key):
+        """
+        Join the call for a key
+
+        Returns:
+            Tuple of (call, is_leader); only the leader executes and must call finish()
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                return call, False
+
+            call = _Call()
+            self._calls[key] = call
+            self.executions += 1
+            return call, True
+
+    def finish(self, key, call, result=None, error=None):
+        """Publish the leader's outcome to all waiters"""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.result = result
+        call.error = error
+        call.done.set()
+
+    def do(self, key, fn):
+        """Run fn once per key among concurrent callers"""
+        call, leader = self.begin(key)
+        if not leader:
+            return call.wait()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result=result)
+        return result
+
+    def stats(self):
+        """Executions vs. coalesced callers"""
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
@@ -0,0 +1,39 @@
+"""
+Vector Alias - Pointer to the live vector index generation
+A rebuild writes a complete shadow index (and Chroma collection), then swaps this small
+JSON file atomically so every process picks up the new generation on its next load
+"""
+import os
+import json
+
+VECTOR_ALIAS_PATH = os.getenv("VECTOR_ALIAS_PATH", "data/vector_alias.json")
+
+
+def read_alias(path=VECTOR_ALIAS_PATH):
+    """Current alias target ({} when no rebuild has been swapped in yet)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"⚠️  Could not read vector alias {path}: {e}")
+        return {}
+
+
+def write_alias(target, path=VECTOR_ALIAS_PATH):
+    """
+    Point the alias at a new generation (atomic rename)
+
+    Args:
+        target: Dict with index_path, manifest_path and collection_name
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(target, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,427 @@
+"""
+Local Vector Index - In-process cosine similarity search over NumPy embeddings
+Mirrors the subset of the ChromaDB collection API used by the RAG system, so
+RAGQuery can search it without a network round trip.
+Vectors, documents and metadata are saved as memory-mappable files, so processes
+loading the same saved index share one copy through the page cache
+"""
+import os
+import json
+import threading
+import numpy as np
+
+
+class LocalVectorIndex:
+    def __init__(self, index_path="data/vector_index.npy", dimensions=384,
+                 ann_threshold=50000, ann_probe=8):
+        """
+        Initialize local vector index
+
+        Args:
+            index_path: Path of the .npy embedding matrix (metadata sits next to it)
+            dimensions: Embedding dimensions
+            ann_threshold: Corpus size above which the IVF (ANN) structure is used
+            ann_probe: Number of IVF lists scanned per query
+        """
+        self.index_path = index_path
+        self.meta_path, self.documents_path, self.metadatas_path, self.offsets_path = self.sidecar_paths(index_path)
+        self.dimensions = dimensions
+        self.ann_threshold = ann_threshold
+        self.ann_probe = ann_probe
+
+        self._lock = threading.RLock()
+        self._ids = []
+        self._positions = {}
+        self._documents = []
+        self._metadatas = []
+        self._embeddings = np.zeros((0, dimensions), dtype=np.float32)
+        self._buffer = None  # Writable backing array with spare rows for appends
+        self._ivf = None
+        self._columns = {}
+
+        self.load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def sidecar_paths(index_path):
+        """Paths saved next to the .npy matrix: (ids JSON, documents, metadatas, row offsets)"""
+        base = os.path.splitext(index_path)[0]
+        return base + "_meta.json", base + "_documents.bin", base + "_metadatas.bin", base + "_offsets.npy"
+
+    @classmethod
+    def saved_files(cls, index_path):
+        """Every file of a saved index (the .npy matrix first)"""
+        return (index_path,) + cls.sidecar_paths(index_path)
+
+    def load(self):
+        """Load embeddings, documents and metadata (all memory-mapped) from disk if present"""
+        if not (os.path.exists(self.index_path) and os.path.exists(self.meta_path)):
+            return False
+
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            embeddings = np.load(self.index_path, mmap_mode="r")
+            n_rows = len(meta.get("ids", []))
+
+            if "documents" in meta:
+                # Indexes saved before documents moved out of the JSON file
+                documents = meta["documents"]
+                metadatas = meta.get("metadatas", [{}] * n_rows)
+            else:
+                offsets = np.load(self.offsets_path, mmap_mode="r")
+                documents = MappedRows(self.documents_path, offsets[0])
+                metadatas = MappedRows(self.metadatas_path, offsets[1], as_json=True)
+
+            if embeddings.shape[0] != n_rows or len(documents) != n_rows or len(metadatas) != n_rows:
+                print("⚠️  Local vector index is inconsistent, ignoring it")
+                return False
+
+            with self._lock:
+                self._ids = meta["ids"]
+                self._documents = documents
+                self._metadatas = metadatas
+                self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+                self._embeddings = embeddings
+                self._buffer = None
+                self._ivf = None
+                self._columns = {}
+
+            print(f"📂 Loaded local vector index: {len(self._ids)} records")
+            return True
+
+        except Exception as e:
+            print(f"⚠️  Could not load local vector index: {e}")
+            return False
+
+    def save(self):
+        """Persist embeddings, documents and metadata atomically (write temp files, then rename)"""
+        with self._lock:
+            embeddings = np.ascontiguousarray(self._embeddings, dtype=np.float32)
+            meta = {
+                "dimensions": self.dimensions,
+                "ids": list(self._ids),
+            }
+            documents = list(self._documents)
+            metadatas = list(self._metadatas)
+
+        directory = os.path.dirname(self.index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        offsets = np.zeros((2, len(documents) + 1), dtype=np.int64)
+        with open(self.documents_path + ".tmp", "wb") as f:
+            offsets[0, 1:] = np.cumsum([f.write((document or "").encode("utf-8")) for document in documents])
+        with open(self.metadatas_path + ".tmp", "wb") as f:
+            offsets[1, 1:] = np.cumsum([
+                f.write(json.dumps(metadata or {}, ensure_ascii=False).encode("utf-8")) for metadata in metadatas
+            ])
+        with open(self.offsets_path + ".tmp", "wb") as f:
+            np.save(f, offsets)
+        with open(self.index_path + ".tmp", "wb") as f:
+            np.save(f, embeddings)
+        with open(self.meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        # The ids file goes last: a reader never sees it ahead of the rows it describes
+        for path in (self.documents_path, self.metadatas_path, self.offsets_path, self.index_path, self.meta_path):
+            os.replace(path + ".tmp", path)
+
+    # ------------------------------------------------------------------
+    # Collection-compatible API
+    # ------------------------------------------------------------------
+
+    def count(self):
+        """Number of stored vectors"""
+        return len(self._ids)
+
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        """Add vectors (existing ids are overwritten, like upsert)"""
+        self.upsert(ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        """Insert or replace vectors by id"""
+        if not ids:
+            return
+
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        documents = documents or [""] * len(ids)
+        metadatas = metadatas or [{}] * len(ids)
+
+        with self._lock:
+            self._writable_rows()
+            n_rows = len(self._ids)
+            replaced = []
+            appended = []
+
+            for doc_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+                position = self._positions.get(doc_id)
+                if position is None:
+                    position = len(self._ids)
+                    self._positions[doc_id] = position
+                    self._ids.append(doc_id)
+                    self._documents.append(document)
+                    self._metadatas.append(metadata)
+                else:
+                    self._documents[position] = document
+                    self._metadatas[position] = metadata
+                (replaced if position < n_rows else appended).append((position, vector))
+
+            # Appends go into spare rows; replacing rows readers may be scoring copies first
+            buffer = self._writable_buffer(len(self._ids), copy=bool(replaced))
+            for position, vector in replaced + appended:
+                buffer[position] = vector
+
+            self._embeddings = buffer[:len(self._ids)]
+            self._ivf = None
+            self._columns = {}
+
+    def _writable_rows(self):
+        """Copy memory-mapped documents and metadata into lists before the first write"""
+        if not isinstance(self._documents, list):
+            self._documents = list(self._documents)
+        if not isinstance(self._metadatas, list):
+            self._metadatas = list(self._metadatas)
+
+    def _writable_buffer(self, rows_needed, copy):
+        """Backing array with room for rows_needed rows (grown geometrically)"""
+        n_rows = self._embeddings.shape[0]
+        buffer = self._buffer
+        if buffer is not None and not copy and buffer.shape[0] >= rows_needed:
+            return buffer
+
+        if buffer is None or buffer.shape[0] < rows_needed:
+            capacity = max(rows_needed, int(n_rows * 1.5), 64)
+        else:
+            capacity = buffer.shape[0]
+
+        # Also copies out of the read-only memory map on first write
+        grown = np.empty((capacity, self.dimensions), dtype=np.float32)
+        grown[:n_rows] = self._embeddings[:n_rows]
+        self._buffer = grown
+        return grown
+
+    def delete(self, ids):
+        """Remove vectors by id"""
+        with self._lock:
+            drop = {self._positions[doc_id] for doc_id in ids if doc_id in self._positions}
+            if not drop:
+                return
+
+            keep = [i for i in range(len(self._ids)) if i not in drop]
+            self._embeddings = np.array(self._embeddings[keep], dtype=np.float32)
+            self._buffer = self._embeddings
+            self._ids = [self._ids[i] for i in keep]
+            self._documents = [self._documents[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            self._ivf = None
+            self._columns = {}
+
+    def get(self, ids=None, include=None, limit=None, offset=0):
+        """Fetch stored records by id (or a page of all records)"""
+        include = include if include is not None else ["documents", "metadatas"]
+
+        with self._lock:
+            if ids is not None:
+                positions = [self._positions[i] for i in ids if i in self._positions]
+            else:
+                end = len(self._ids) if limit is None else offset + limit
+                positions = list(range(offset, min(end, len(self._ids))))
+
+            result = {"ids": [self._ids[p] for p in positions]}
+            if "documents" in include:
+                result["documents"] = [self._documents[p] for p in positions]
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[p] for p in positions]
+            if "embeddings" in include:
+                result["embeddings"] = np.asarray(self._embeddings[positions]).tolist()
+
+        return result
+
+    def query(self, query_embeddings, n_results=5, include=None, where=None):
+        """
+        Cosine top-k search
+
+        Args:
+            query_embeddings: List of query vectors
+            n_results: Number of results per query
+            where: Optional Chroma-style metadata filter, applied before scoring
+
+        Returns:
+            Chroma-shaped dict of per-query lists (distance = 1 - cosine similarity)
+        """
+        queries = self._normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        with self._lock:
+            matrix = self._embeddings
+            ids, documents, metadatas = self._ids, self._documents, self._metadatas
+            n_rows = matrix.shape[0]
+            if where:
+                # Only rows passing the filter are scored at all
+                filtered = np.flatnonzero(self._evaluate_where(where, n_rows))
+                ivf = None
+            else:
+                filtered = None
+                ivf = self._get_ivf(matrix) if n_rows >= self.ann_threshold else None
+
+        for query in queries:
+            if filtered is not None:
+                candidates = filtered
+            elif ivf is not None:
+                candidates = self._ivf_candidates(ivf, query)
+            else:
+                candidates = None
+
+            scores = (matrix[candidates] if candidates is not None else matrix[:n_rows]) @ query
+            k = min(n_results, len(scores))
+            if k == 0:
+                for key in result:
+                    result[key].append([])
+                continue
+
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            positions = candidates[top] if candidates is not None else top
+
+            result["ids"].append([ids[p] for p in positions])
+            result["documents"].append([documents[p] for p in positions])
+            result["metadatas"].append([metadatas[p] for p in positions])
+            result["distances"].append([float(1.0 - s) for s in scores[top]])
+
+        return result
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(vectors):
+        """L2-normalize rows so a dot product is cosine similarity"""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _column(self, field, numeric, n_rows):
+        """Metadata field as an array (cached until the next write)"""
+        key = (field, numeric)
+        column = self._columns.get(key)
+        if column is None or len(column) != n_rows:
+            values = [(metadata or {}).get(field) for metadata in self._metadatas[:n_rows]]
+            if numeric:
+                column = np.array(
+                    [v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in values],
+                    dtype=np.float64
+                )
+            else:
+                column = np.empty(n_rows, dtype=object)
+                column[:] = values
+            self._columns[key] = column
+        return column
+
+    def _evaluate_where(self, where, n_rows):
+        """Boolean row mask for a Chroma-style where clause ($and/$or/$eq/$ne/$in/$gt/$gte/$lt/$lte)"""
+        mask = np.ones(n_rows, dtype=bool)
+        for field, condition in where.items():
+            if field == "$and":
+                for clause in condition:
+                    mask &= self._evaluate_where(clause, n_rows)
+                continue
+            if field == "$or":
+                any_mask = np.zeros(n_rows, dtype=bool)
+                for clause in condition:
+                    any_mask |= self._evaluate_where(clause, n_rows)
+                mask &= any_mask
+                continue
+
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, value in condition.items():
+                if op in ("$eq", "$ne", "$in", "$nin"):
+                    column = self._column(field, False, n_rows)
+                    if op == "$eq":
+                        mask &= column == value
+                    elif op == "$ne":
+                        mask &= column != value
+                    else:
+                        members = np.isin(column, list(value))
+                        mask &= members if op == "$in" else ~members
+                elif op in ("$gt", "$gte", "$lt", "$lte"):
+                    column = self._column(field, True, n_rows)
+                    with np.errstate(invalid="ignore"):
+                        if op == "$gt":
+                            mask &= column > value
+                        elif op == "$gte":
+                            mask &= column >= value
+                        elif op == "$lt":
+                            mask &= column < value
+                        else:
+                            mask &= column <= value
+                else:
+                    raise ValueError(f"Unsupported where operator: {op}")
+        return mask
+
+    def _get_ivf(self, matrix):
+        """Build (or reuse) an inverted-file partition of the matrix via k-means"""
+        if self._ivf is not None:
+            return self._ivf
+
+        n_lists = max(1, int(np.sqrt(matrix.shape[0])))
+        rng = np.random.default_rng(0)
+        centroids = np.array(matrix[rng.choice(matrix.shape[0], n_lists, replace=False)])
+
+        for _ in range(10):
+            assignments = np.argmax(matrix @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = matrix[assignments == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = self._normalize(centroids)
+
+        assignments = np.argmax(matrix @ centroids.T, axis=1)
+        lists = [np.flatnonzero(assignments == c) for c in range(n_lists)]
+        self._ivf = (centroids, lists)
+        return self._ivf
+
+    def _ivf_candidates(self, ivf, query):
+        """Row positions in the lists nearest to the query"""
+        centroids, lists = ivf
+        probe = np.argsort(-(centroids @ query))[:self.ann_probe]
+        return np.concatenate([lists[c] for c in probe])
+
+
+class MappedRows:
+    def __init__(self, path, offsets, as_json=False):
+        """
+        Read-only sequence of rows stored back to back in a memory-mapped file
+
+        Args:
+            path: File holding the UTF-8 encoded rows
+            offsets: Row start offsets, plus the end of the last row
+            as_json: Decode each row as JSON instead of returning the string
+        """
+        self._offsets = offsets
+        self._as_json = as_json
+        size = int(offsets[-1]) if len(offsets) else 0
+        self._data = np.memmap(path, dtype=np.uint8, mode="r", shape=(size,)) if size else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        text = self._data[int(self._offsets[position]):int(self._offsets[position + 1])].tobytes().decode("utf-8")
+        return json.loads(text) if self._as_json else text
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
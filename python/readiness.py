@@ -0,0 +1,84 @@
+"""
+Readiness - Warm-up phases of the API process
+Startup runs in the background; each endpoint checks only the phase it depends on,
+and /api/health reports when every phase started, finished or failed
+"""
+import time
+import threading
+from datetime import datetime
+
+PHASES = ('data_loaded', 'index_ready', 'llm_ready')
+
+
+class Readiness:
+    def __init__(self, phases=PHASES):
+        """
+        Args:
+            phases: Phase names in the order warm-up runs them
+        """
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._events = {phase: threading.Event() for phase in phases}
+        self._phases = {
+            phase: {'state': 'pending', 'started_at': None, 'ready_at': None, 'seconds': None, 'error': None}
+            for phase in phases
+        }
+
+    def start(self, phase):
+        """Mark a phase as running"""
+        with self._lock:
+            entry = self._phases[phase]
+            entry['state'] = 'running'
+            entry['started_at'] = datetime.now().isoformat()
+            entry['_t0'] = time.time()
+
+    def ready(self, phase):
+        """Mark a phase as done"""
+        with self._lock:
+            entry = self._phases[phase]
+            entry['state'] = 'ready'
+            entry['ready_at'] = datetime.now().isoformat()
+            entry['seconds'] = round(time.time() - entry.pop('_t0', self.started_at), 3)
+            entry['error'] = None
+        self._events[phase].set()
+        print(f"✅ Ready: {phase} ({entry['seconds']}s)")
+
+    def fail(self, phase, error):
+        """Mark a phase as failed (it may still become ready on a later attempt)"""
+        with self._lock:
+            entry = self._phases[phase]
+            entry['state'] = 'failed'
+            entry['error'] = str(error)
+            entry.pop('_t0', None)
+        print(f"❌ Warm-up phase {phase} failed: {error}")
+
+    def is_ready(self, phase):
+        return self._events[phase].is_set()
+
+    def wait(self, phase, timeout=None):
+        """Block until a phase is ready; returns False on timeout"""
+        return self._events[phase].wait(timeout)
+
+    def snapshot(self):
+        """JSON-friendly phase states plus an overall status"""
+        with self._lock:
+            phases = {
+                phase: {key: value for key, value in entry.items() if not key.startswith('_')}
+                for phase, entry in self._phases.items()
+            }
+        states = [entry['state'] for entry in phases.values()]
+        if all(state == 'ready' for state in states):
+            status = 'ready'
+        elif 'failed' in states:
+            status = 'degraded'
+        else:
+            status = 'starting'
+        return {
+            'status': status,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'phases': phases
+        }
+
+
+# Process-wide instance
+readiness = Readiness()
@@ -0,0 +1,124 @@
+"""
+Record Model - Compact in-memory representation of a fetched record
+Categorical strings are interned so every record shares one copy of 'India', 'active',
+'Government of India' and the source names, fields only read when a record is rendered
+(content, raw_data, url, image, alternate_sources) are kept together as one zlib-compressed blob, and
+attribute slots replace the per-record dict.
+Records still read like dicts (get, [], items) and to_dict() renders the original JSON shape
+"""
+import sys
+import json
+import zlib
+
+# Low-cardinality fields shared by many records
+CATEGORICAL_FIELDS = ('type', 'location', 'status', 'priority', 'ministry', 'source')
+
+# Fields kept compressed until a record is rendered
+LAZY_FIELDS = ('content', 'raw_data', 'url', 'image', 'alternate_sources')
+
+# Lazy blobs shorter than this (as JSON) are not worth compressing
+COMPRESS_MIN_BYTES = 128
+
+# Key orders seen so far; records with the same keys share one tuple
+_SHAPES = {}
+
+
+def _pack(values):
+    """Lazy field values as compressed JSON (or the dict itself when tiny)"""
+    encoded = json.dumps(values, ensure_ascii=False, default=str).encode('utf-8')
+    if len(encoded) < COMPRESS_MIN_BYTES:
+        return values
+    return zlib.compress(encoded)
+
+
+def _unpack(blob):
+    if isinstance(blob, bytes):
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+    return blob
+
+
+class Record:
+    # Fields held in their own slot (everything else is lazy or extra)
+    FIELDS = (
+        'id', 'type', 'title', 'description', 'location', 'date', 'status', 'priority',
+        'ministry', 'impact', 'source'
+    )
+    __slots__ = ('_keys', '_lazy', '_extra') + FIELDS
+
+    def __init__(self, data):
+        """
+        Args:
+            data: Record dict (any keys; fields outside FIELDS and LAZY_FIELDS are kept as-is)
+        """
+        keys = tuple(data)
+        self._keys = _SHAPES.setdefault(keys, keys)
+        self._extra = None
+        lazy = {}
+        for key, value in data.items():
+            if key in CATEGORICAL_FIELDS and type(value) is str:
+                value = sys.intern(value)
+
+            if key in LAZY_FIELDS:
+                lazy[key] = value
+            elif key in self.FIELDS:
+                setattr(self, key, value)
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = value
+        self._lazy = _pack(lazy) if lazy else None
+
+    @classmethod
+    def wrap(cls, record):
+        """Record for a dict (records are returned unchanged)"""
+        return record if isinstance(record, cls) else cls(record)
+
+    def get(self, key, default=None):
+        if key not in self._keys:
+            return default
+        if key in LAZY_FIELDS:
+            return _unpack(self._lazy)[key]
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return self._extra[key]
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        return self._keys
+
+    def items(self):
+        return list(self.to_dict().items())
+
+    def to_dict(self):
+        """Plain dict in the original key order (what the API and storage serialize)"""
+        lazy = _unpack(self._lazy) if self._lazy is not None else {}
+        result = {}
+        for key in self._keys:
+            if key in lazy:
+                result[key] = lazy[key]
+            elif key in self.FIELDS:
+                result[key] = getattr(self, key)
+            else:
+                result[key] = self._extra[key]
+        return result
+
+    def __repr__(self):
+        return f"Record(id={self.get('id')!r}, type={self.get('type')!r})"
+
+
+def as_dict(record):
+    """JSON-serializable form of a Record or plain dict"""
+    return record.to_dict() if isinstance(record, Record) else record
@@ -0,0 +1,130 @@
+"""
+Record Store - Indexed, immutable view of the fetched records
+Built once per fetch and swapped in atomically. Records are held in the compact Record
+model and the indexed fields are dictionary-encoded into integer columns, so filters,
+counts and aggregates are array passes instead of per-record dictionary lookups
+"""
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from record_model import Record
+
+
+class RecordStore:
+    INDEXED_FIELDS = ('type', 'ministry', 'status', 'location')
+
+    def __init__(self, records):
+        """
+        Build the columns and indexes over a list of records
+
+        Args:
+            records: List of record dicts or Records (kept in their original order)
+        """
+        self.records = [Record.wrap(record) for record in records]
+        self.by_id = {}
+        for position, record in enumerate(self.records):
+            record_id = record.get('id')
+            if record_id is not None:
+                self.by_id[record_id] = position
+
+        # field -> (codes per record, distinct values, value -> code)
+        self._columns = {}
+        for field in self.INDEXED_FIELDS:
+            self._columns[field] = self._encode(record.get(field) for record in self.records)
+        self._columns['month'] = self._encode(
+            str(record.get('date') or '')[:7] or None for record in self.records
+        )
+
+        # Positions sorted by date for range queries
+        dated = sorted((str(record.get('date') or ''), position) for position, record in enumerate(self.records))
+        self._date_keys = [date for date, _ in dated]
+        self._date_positions = [position for _, position in dated]
+
+    def _encode(self, values):
+        """Dictionary-encode a column of values"""
+        lookup = {}
+        codes = np.fromiter((lookup.setdefault(value, len(lookup)) for value in values),
+                            dtype=np.int32, count=len(self.records))
+        return codes, list(lookup), lookup
+
+    def __len__(self):
+        return len(self.records)
+
+    def get(self, record_id):
+        """Record by ID (None if missing)"""
+        position = self.by_id.get(record_id)
+        return self.records[position] if position is not None else None
+
+    def column(self, field):
+        """
+        Dictionary-encoded column of an indexed field (or 'month', the date's YYYY-MM)
+
+        Returns:
+            Tuple of (int32 code per record, list of distinct values indexed by code)
+        """
+        codes, values, _ = self._columns[field]
+        return codes, values
+
+    def count(self, field, value):
+        """Number of records with field == value"""
+        codes, _, lookup = self._columns[field]
+        code = lookup.get(value)
+        return int(np.count_nonzero(codes == code)) if code is not None else 0
+
+    def counts(self, field):
+        """Record count per value of an indexed field"""
+        codes, values, _ = self._columns[field]
+        totals = np.bincount(codes, minlength=len(values))
+        return {value: int(total) for value, total in zip(values, totals) if total}
+
+    def _mask(self, criteria):
+        """Boolean mask of records matching all criteria (None when there are none)"""
+        mask = None
+        for field, value in criteria.items():
+            if value is None:
+                continue
+            codes, _, lookup = self._columns[field]
+            code = lookup.get(value)
+            if code is None:
+                return np.zeros(len(self.records), dtype=bool)
+            matches = codes == code
+            mask = matches if mask is None else mask & matches
+        return mask
+
+    def positions(self, **criteria):
+        """
+        Positions of records matching all field == value criteria (None values are ignored)
+
+        Returns:
+            Sorted list of positions, or None when there are no criteria (i.e. everything)
+        """
+        mask = self._mask(criteria)
+        return np.flatnonzero(mask).tolist() if mask is not None else None
+
+    def filter(self, limit=None, **criteria):
+        """Records matching the criteria in original order (at most limit)"""
+        positions = self.positions(**criteria)
+        if positions is None:
+            return self.records[:limit] if limit is not None else list(self.records)
+        if limit is not None:
+            positions = positions[:limit]
+        return [self.records[position] for position in positions]
+
+    def between_dates(self, start=None, end=None):
+        """Positions of records whose date string falls in [start, end]"""
+        lo = bisect_left(self._date_keys, start) if start else 0
+        hi = bisect_right(self._date_keys, end + '\uffff') if end else len(self._date_keys)
+        return self._date_positions[lo:hi]
+
+    def related(self, record, limit=5):
+        """Other records of the same type"""
+        related = []
+        codes, _, lookup = self._columns['type']
+        for position in np.flatnonzero(codes == lookup.get(record.get('type'), -1)).tolist():
+            candidate = self.records[position]
+            if candidate.get('id') != record.get('id'):
+                related.append(candidate)
+                if len(related) >= limit:
+                    break
+        return related
@@ -0,0 +1,119 @@
+"""
+Search Index - Inverted index with BM25 ranking for /api/search
+Built once per ingest; a query only touches the posting lists of its terms
+"""
+import re
+import json
+import math
+import heapq
+import base64
+from bisect import bisect_left
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Lowercase word tokens"""
+    return TOKEN_PATTERN.findall((text or '').lower())
+
+
+class SearchIndex:
+    def __init__(self, records, version=None, k1=1.5, b=0.75, max_prefix_expansions=50):
+        """
+        Build the index over record titles and descriptions
+
+        Args:
+            records: List of record dicts
+            version: Dataset version; cursors from other versions are rejected
+            k1, b: BM25 parameters
+            max_prefix_expansions: Most vocabulary terms a prefix may expand to
+        """
+        self.records = records
+        self.version = version
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_expansions = max_prefix_expansions
+
+        self.postings = {}  # term -> list of (doc, term frequency)
+        self.doc_lengths = []
+        for doc, record in enumerate(records):
+            tokens = tokenize(f"{record.get('title', '')} {record.get('description', '')}")
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, []).append((doc, tf))
+
+        self.avg_doc_length = (sum(self.doc_lengths) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        self.vocabulary = sorted(self.postings)
+
+    def search(self, query, limit=20, cursor=None):
+        """
+        Ranked search
+
+        Args:
+            query: Free-text query; the last word also matches as a prefix
+            limit: Page size
+            cursor: Opaque cursor from a previous page
+
+        Returns:
+            Tuple of (list of (record, score), next_cursor or None, total matches)
+
+        Raises:
+            ValueError: If the cursor is malformed or from an older dataset
+        """
+        offset = self._decode_cursor(cursor) if cursor else 0
+        tokens = tokenize(query)
+        if not tokens:
+            return [], None, 0
+
+        scores = {}
+        for i, token in enumerate(tokens):
+            is_last = i == len(tokens) - 1
+            for term in self._expand(token, prefix=is_last):
+                self._score_term(term, scores)
+
+        # Heap-select only as many hits as this page needs
+        wanted = offset + limit
+        top = heapq.nlargest(wanted, scores.items(), key=lambda item: (item[1], -item[0]))
+        page = [(self.records[doc], score) for doc, score in top[offset:wanted]]
+        next_cursor = self._encode_cursor(wanted) if len(scores) > wanted else None
+        return page, next_cursor, len(scores)
+
+    def _expand(self, token, prefix):
+        """Index terms a query token matches"""
+        if not prefix:
+            return [token] if token in self.postings else []
+
+        terms = []
+        start = bisect_left(self.vocabulary, token)
+        for term in self.vocabulary[start:start + self.max_prefix_expansions]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def _score_term(self, term, scores):
+        """Add one term's BM25 contribution to every document in its posting list"""
+        postings = self.postings.get(term, ())
+        n_docs = len(self.doc_lengths)
+        idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+
+        for doc, tf in postings:
+            length_norm = 1 - self.b + self.b * self.doc_lengths[doc] / (self.avg_doc_length or 1)
+            scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+
+    def _encode_cursor(self, offset):
+        payload = json.dumps({'o': offset, 'v': self.version}).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def _decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            offset = int(payload['o'])
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if offset < 0:
+            raise ValueError("Invalid cursor")
+        if payload.get('v') != self.version:
+            raise ValueError("Cursor expired: data has been updated, restart the search")
+        return offset
@@ -0,0 +1,170 @@
+"""
+Snapshots - Immutable, versioned dataset + vector index published by the scheduler leader
+Each version lives in its own directory under data/snapshots/ and is never modified;
+a CURRENT pointer is swapped atomically and followers memory-map the files it names
+"""
+import os
+import json
+import shutil
+import threading
+from datetime import datetime
+
+from record_model import as_dict
+from rag.vector_index import LocalVectorIndex
+
+
+class SnapshotStore:
+    CURRENT_FILE = 'CURRENT'
+    RECORDS_FILE = 'records.jsonl'
+    INDEX_FILE = 'vector_index.npy'
+
+    def __init__(self, root="data/snapshots", keep=3):
+        """
+        Args:
+            root: Directory holding one sub-directory per snapshot
+            keep: Number of most recent snapshots kept on disk
+        """
+        self.root = root
+        self.keep = keep
+
+    def current(self):
+        """Pointer to the live snapshot ({'id', 'data_version', ...}) or None"""
+        try:
+            with open(os.path.join(self.root, self.CURRENT_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️  Could not read snapshot pointer: {e}")
+            return None
+
+    def path(self, snapshot_id, name):
+        return os.path.join(self.root, snapshot_id, name)
+
+    def publish(self, records, data_version, index_path=None):
+        """
+        Write a new snapshot and make it current
+
+        Args:
+            records: Full dataset
+            data_version: Dataset fingerprint (fetcher.data_version)
+            index_path: Saved LocalVectorIndex .npy file to include (its documents and metadata files too)
+
+        Returns:
+            The new snapshot ID
+        """
+        current = self.current()
+        if current and current.get('data_version') == data_version and self._same_index(current, index_path):
+            return current['id']
+
+        snapshot_id = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{data_version}"
+        tmp_dir = os.path.join(self.root, f".{snapshot_id}.tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        with open(os.path.join(tmp_dir, self.RECORDS_FILE), 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(as_dict(record), ensure_ascii=False, default=str) + '\n')
+
+        has_index = False
+        if index_path and os.path.exists(index_path):
+            # The live files are only ever replaced by rename, so hard links freeze this version
+            targets = LocalVectorIndex.saved_files(os.path.join(tmp_dir, self.INDEX_FILE))
+            for source, target in zip(LocalVectorIndex.saved_files(index_path), targets):
+                if os.path.exists(source):
+                    self._link_or_copy(source, target)
+            has_index = True
+
+        os.replace(tmp_dir, os.path.join(self.root, snapshot_id))
+
+        pointer = {
+            'id': snapshot_id,
+            'data_version': data_version,
+            'count': len(records),
+            'has_index': has_index,
+            'published_at': datetime.now().isoformat()
+        }
+        tmp_pointer = os.path.join(self.root, self.CURRENT_FILE + '.tmp')
+        with open(tmp_pointer, 'w', encoding='utf-8') as f:
+            json.dump(pointer, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pointer, os.path.join(self.root, self.CURRENT_FILE))
+
+        print(f"📸 Published snapshot {snapshot_id} ({len(records)} records)")
+        self._prune(snapshot_id)
+        return snapshot_id
+
+    def load_records(self, snapshot_id):
+        """Records of a snapshot"""
+        with open(self.path(snapshot_id, self.RECORDS_FILE), 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _same_index(self, pointer, index_path):
+        """Whether a snapshot already holds exactly this index file (same inode via hard link)"""
+        if not pointer.get('has_index'):
+            return not (index_path and os.path.exists(index_path))
+        try:
+            return bool(index_path) and os.path.samefile(index_path, self.path(pointer['id'], self.INDEX_FILE))
+        except OSError:
+            return False
+
+    def _link_or_copy(self, source, target):
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def _prune(self, current_id):
+        """Delete all but the newest snapshots (open memory maps stay valid on POSIX)"""
+        try:
+            snapshot_ids = sorted(
+                name for name in os.listdir(self.root)
+                if not name.startswith('.') and name != self.CURRENT_FILE and not name.endswith('.tmp')
+            )
+        except FileNotFoundError:
+            return
+        for snapshot_id in snapshot_ids[:-self.keep]:
+            if snapshot_id != current_id:
+                shutil.rmtree(os.path.join(self.root, snapshot_id), ignore_errors=True)
+
+
+class SnapshotFollower:
+    def __init__(self, store, on_change, interval_seconds=15):
+        """
+        Poll the CURRENT pointer and call on_change(pointer) when it moves
+
+        Args:
+            store: SnapshotStore to watch
+            on_change: Callback receiving the new pointer dict
+            interval_seconds: Polling interval
+        """
+        self.store = store
+        self.on_change = on_change
+        self.interval_seconds = interval_seconds
+        self.current_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """Load the current snapshot if it changed; returns True if it did"""
+        pointer = self.store.current()
+        if not pointer or pointer.get('id') == self.current_id:
+            return False
+        try:
+            self.on_change(pointer)
+            self.current_id = pointer['id']
+            return True
+        except Exception as e:
+            print(f"⚠️  Could not load snapshot {pointer.get('id')}: {e}")
+            return False
+
+    def start(self):
+        def run():
+            while not self._stop.wait(self.interval_seconds):
+                self.check()
+
+        self._thread = threading.Thread(target=run, name="snapshot-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
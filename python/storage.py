@@ -0,0 +1,266 @@
+"""
+Record Storage - Append-only persistence for fetched records
+A compact JSONL snapshot plus an append-only segment log of fetch batches. Appends never
+rewrite existing data, snapshots are replaced by atomic rename, and the log is compacted
+into a new snapshot once it grows past the snapshot size
+"""
+import os
+import json
+import threading
+from datetime import datetime
+
+from record_model import as_dict
+
+
+class RecordStorage:
+    SNAPSHOT_FILE = 'snapshot.jsonl'
+    LOG_FILE = 'log.jsonl'
+    META_FILE = 'meta.json'
+
+    def __init__(self, directory="data/store", legacy_path="data/fetched_data.json", min_compact_bytes=1 << 20):
+        """
+        Args:
+            directory: Folder holding the snapshot, log and meta files
+            legacy_path: Pretty-printed JSON cache imported when the store is empty
+            min_compact_bytes: Log size below which compaction is never triggered
+        """
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self.min_compact_bytes = min_compact_bytes
+        self._lock = threading.Lock()
+        self._meta = None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """
+        Current records, newest fetch batch first
+
+        Returns:
+            List of record dicts, or None if nothing has been stored yet
+            (the legacy JSON file is imported on first use)
+        """
+        with self._lock:
+            if not os.path.exists(self._path(self.SNAPSHOT_FILE)) and not os.path.exists(self._path(self.LOG_FILE)):
+                if not self.legacy_path or not os.path.exists(self.legacy_path):
+                    return None
+                return self._import_legacy(self.legacy_path)
+
+            snapshot = list(self._read_lines(self.SNAPSHOT_FILE))
+            records = {record.get('id'): record for record in snapshot}
+            batches = []
+
+            for entry in self._read_lines(self.LOG_FILE):
+                if entry.get('op') == 'put':
+                    batch = entry.get('records', [])
+                    for record in batch:
+                        records[record.get('id')] = record
+                    batches.append([record.get('id') for record in batch])
+                elif entry.get('op') == 'del':
+                    for record_id in entry.get('ids', []):
+                        records.pop(record_id, None)
+
+            # Latest batch first, then older batches, then the snapshot order
+            ordered = []
+            seen = set()
+            id_lists = list(reversed(batches)) + [[record.get('id') for record in snapshot]]
+            for ids in id_lists:
+                for record_id in ids:
+                    if record_id in records and record_id not in seen:
+                        seen.add(record_id)
+                        ordered.append(records[record_id])
+            return ordered
+
+    def _read_lines(self, name):
+        """Decoded JSON lines of a file; a torn final line from a crashed append is skipped"""
+        try:
+            with open(self._path(name), 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+
+        for number, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if number == len(lines) - 1:
+                    print(f"⚠️  Ignoring incomplete last entry in {name}")
+                else:
+                    raise
+
+    def meta(self):
+        """Meta information (last_updated, count, ...); empty dict if nothing stored"""
+        if self._meta is None:
+            try:
+                with open(self._path(self.META_FILE), 'r', encoding='utf-8') as f:
+                    self._meta = json.load(f)
+            except FileNotFoundError:
+                self._meta = self._legacy_meta()
+            except Exception as e:
+                print(f"⚠️  Could not read storage meta: {e}")
+                self._meta = {}
+        return self._meta
+
+    def refresh(self):
+        """Forget cached meta (another process may have written newer data)"""
+        self._meta = None
+
+    def last_updated(self):
+        """Time of the last stored fetch (None if unknown)"""
+        value = self.meta().get('last_updated')
+        try:
+            return datetime.fromisoformat(value) if value else None
+        except ValueError:
+            return None
+
+    def _legacy_meta(self):
+        """Timestamp of the legacy JSON file, read without parsing the records"""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return {}
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                head = f.read(4096)
+            marker = head.find('"last_updated"')
+            if marker >= 0:
+                start = head.index('"', head.index(':', marker)) + 1
+                return {'last_updated': head[start:head.index('"', start)]}
+        except ValueError:
+            pass
+        except Exception as e:
+            print(f"⚠️  Could not read {self.legacy_path}: {e}")
+        return {}
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, records, removed_ids=(), total=None, updated_at=None):
+        """
+        Durably append one fetch batch
+
+        Args:
+            records: Records fetched in this cycle (new or updated)
+            removed_ids: IDs dropped from the dataset
+            total: Record count after the merge (stored in meta)
+            updated_at: Fetch time (defaults to now)
+        """
+        updated_at = updated_at or datetime.now()
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._trim_torn_tail()
+            with open(self._path(self.LOG_FILE), 'a', encoding='utf-8') as f:
+                if removed_ids:
+                    f.write(json.dumps({'op': 'del', 'ids': list(removed_ids)}, ensure_ascii=False) + '\n')
+                if records:
+                    f.write(json.dumps({'op': 'put', 'records': [as_dict(record) for record in records]}, ensure_ascii=False, default=str) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+            meta = dict(self.meta())
+            meta['last_updated'] = updated_at.isoformat()
+            if total is not None:
+                meta['count'] = total
+            self._write_meta(meta)
+
+    def _trim_torn_tail(self):
+        """Cut an incomplete last line (crash mid-append) so new entries start on a fresh line"""
+        try:
+            with open(self._path(self.LOG_FILE), 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                if size == 0:
+                    return
+                f.seek(size - 1)
+                if f.read(1) == b'\n':
+                    return
+                f.seek(0)
+                data = f.read()
+                f.truncate(data.rfind(b'\n') + 1)
+        except FileNotFoundError:
+            pass
+
+    def should_compact(self):
+        """True once the log is larger than the snapshot (and past the minimum size)"""
+        log_bytes = self._size(self.LOG_FILE)
+        return log_bytes >= self.min_compact_bytes and log_bytes > self._size(self.SNAPSHOT_FILE)
+
+    def compact(self, records):
+        """
+        Fold the log into a fresh snapshot
+
+        Args:
+            records: The full current dataset (as returned by load() plus appends)
+        """
+        with self._lock:
+            self._write_snapshot(records)
+            # The snapshot now covers every logged batch
+            self._atomic_write(self.LOG_FILE, '')
+            print(f"🗜️  Compacted record storage ({len(records)} records)")
+
+    def export_json(self, path, records):
+        """Write the legacy pretty-printed JSON file (atomically)"""
+        payload = {
+            'last_updated': self.meta().get('last_updated') or datetime.now().isoformat(),
+            'count': len(records),
+            'data': [as_dict(record) for record in records]
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def import_json(self, path):
+        """Replace the stored dataset with the contents of a legacy JSON file"""
+        with self._lock:
+            return self._import_legacy(path)
+
+    def _import_legacy(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        records = cached.get('data', [])
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_snapshot(records)
+        self._atomic_write(self.LOG_FILE, '')
+        self._write_meta({
+            'last_updated': cached.get('last_updated') or datetime.now().isoformat(),
+            'count': len(records),
+            'imported_from': path
+        })
+        print(f"📦 Imported {len(records)} records from {path}")
+        return records
+
+    def _write_snapshot(self, records):
+        lines = ''.join(json.dumps(as_dict(record), ensure_ascii=False, default=str) + '\n' for record in records)
+        self._atomic_write(self.SNAPSHOT_FILE, lines)
+        meta = dict(self.meta())
+        meta['count'] = len(records)
+        meta['compacted_at'] = datetime.now().isoformat()
+        self._write_meta(meta)
+
+    def _write_meta(self, meta):
+        self._atomic_write(self.META_FILE, json.dumps(meta, ensure_ascii=False))
+        self._meta = meta
+
+    def _atomic_write(self, name, text):
+        """Write a file via tmp + fsync + rename so readers never see a partial file"""
+        path = self._path(name)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _size(self, name):
+        try:
+            return os.path.getsize(self._path(name))
+        except OSError:
+            return 0
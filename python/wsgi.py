@@ -0,0 +1,17 @@
+"""
+WSGI entry point for production serving
+Run several threaded workers (gunicorn.conf.py sets this up), e.g.:
+    gunicorn wsgi:app
+    gunicorn -w 4 -k gthread --threads 28 -b 0.0.0.0:8010 wsgi:app
+Threads per worker must exceed CHAT_MAX_IN_FLIGHT + CHAT_MAX_QUEUE, or chat requests occupy
+every thread before the admission queue can answer 429/503.
+Do not use --preload: each worker starts its own warm-up thread.
+One worker wins the scheduler election and publishes snapshots; the rest serve them
+"""
+import os
+
+os.environ.setdefault("TRACK_INDIA_MODE", "production")
+
+from app import app, start_warmup
+
+start_warmup()